@@ -7,6 +7,7 @@ import logging
 import warnings
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib3.exceptions import InsecureRequestWarning
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
@@ -20,12 +21,13 @@ load_dotenv()
 # Import routers
 from .routers import api_router, websocket_router
 from .routers.penny_stock_monitor_router import router as penny_stock_router
-from .services import ibkr_service, telegram_service
+from .services import ibkr_service, telegram_service, get_free_runner_service
 from .routers.internal_router import router as internal_router
 from .services import penny_stock_watcher
 from .services import penny_position_monitor
 from .services.order_tracking_service import order_tracking_service
-from .services.handlers.lite_handlers import _cleanup_stale_alerts
+from .services.handlers.lite_handlers import _cleanup_stale_alerts, _flush_alerts
+from .services.contract_storage import contract_storage
 
 logger = logging.getLogger(__name__)
 
@@ -114,11 +116,12 @@ async def wait_for_ibkr_ready(max_attempts: int = None, delay: int = 5) -> None:
     raise Exception(error_msg)
 
 async def periodic_alert_cleanup():
-    """Periodic task to clean up stale alerts"""
+    """Periodic task to clean up stale alerts and expired stored contracts"""
     while True:
         try:
             await asyncio.sleep(3600)  # Run every hour
             _cleanup_stale_alerts(hours_old=24)  # Clean alerts older than 24 hours
+            contract_storage.cleanup_expired_contracts()
         except asyncio.CancelledError:
             logger.info("Alert cleanup task cancelled")
             break
@@ -153,6 +156,14 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"IBKR final check warning: {e}")
     
+    # Size the default executor that alert handlers are offloaded to
+    try:
+        pool_size = int(os.getenv("ALERTER_THREAD_POOL_SIZE", "32"))
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=pool_size))
+        logger.info(f"Default executor sized to {pool_size} worker threads")
+    except Exception as e:
+        logger.error(f"Failed to configure default executor: {e}")
+
     # Initialize Telegram bot in background
     try:
         # Start bot in background task so it doesn't block startup
@@ -181,6 +192,13 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to start order tracking service: {e}")
     
+    # Start free runner monitoring
+    try:
+        await get_free_runner_service().start()
+        logger.info("Free runner service startup initiated")
+    except Exception as e:
+        logger.error(f"Failed to start free runner service: {e}")
+    
     # Start periodic alert cleanup
     try:
         asyncio.create_task(periodic_alert_cleanup())
@@ -210,6 +228,14 @@ async def lifespan(app: FastAPI):
         logger.info("Order tracking service stopped")
     except Exception as e:
         logger.error(f"Error stopping order tracking service: {e}")
+    try:
+        await get_free_runner_service().stop()
+    except Exception as e:
+        logger.error(f"Error stopping free runner service: {e}")
+    try:
+        _flush_alerts(pretty=True)
+    except Exception as e:
+        logger.error(f"Error flushing alerts: {e}")
 
 # Authentication middleware
 async def auth_middleware(request: Request, call_next):
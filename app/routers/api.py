@@ -7,7 +7,7 @@ from typing import Dict, Any
 from pydantic import BaseModel
 
 from ..models import FreeRunnerRequest, EchoRequest
-from ..services import ibkr_service, free_runner_service, notification_service
+from ..services import ibkr_service, get_free_runner_service, notification_service
 from ..services.stop_loss_service import stop_loss_management_service
 from ..utils import format_error_response, format_success_response
 
@@ -443,7 +443,7 @@ def echo(request: EchoRequest):
 def free_runner(request: FreeRunnerRequest):
     """Execute free runner logic"""
     try:
-        result = free_runner_service.execute_free_runner(request.dict())
+        result = get_free_runner_service().execute_free_runner(request.dict())
         
         if result["success"]:
             return format_success_response(
@@ -3,14 +3,38 @@ WebSocket route handler for real-time data subscriptions
 """
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import asyncio
+import json
 from typing import Dict, Any
 
-from ..services import ibkr_service, free_runner_service
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib decoder
+    orjson = None
+
+from ..services import ibkr_service, get_free_runner_service
 from ..services.pnl_pubsub import pnl_pubsub
 from ..models import WebSocketMessage
 
 router = APIRouter()
 
+# Seconds between full recomputes of the running position totals
+TOTALS_RECOMPUTE_INTERVAL = 60.0
+# Seconds between positions polls
+POSITIONS_POLL_INTERVAL = 5.0
+
+
+async def receive_command(websocket: WebSocket) -> Dict[str, Any]:
+    """Receive one client command frame (text or bytes) and decode it as JSON"""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    raw = message.get("bytes")
+    if raw is None:
+        raw = message.get("text") or ""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -23,57 +47,89 @@ async def websocket_endpoint(websocket: WebSocket):
     # Store polling task references
     positions_task = None
     orders_task = None
-    free_runner_task = None
+    free_runner_service = get_free_runner_service()
 
     try:
         async def get_positions_snapshot():
-            """Get current positions snapshot from IBKR API"""
+            """Get current positions snapshot, shared with the free runner checks"""
             try:
-                positions = ibkr_service.get_formatted_positions()
-                return positions
+                return await free_runner_service.get_positions_snapshot()
             except Exception as e:
                 await websocket.send_json({"type": "error", "message": f"Failed to get positions: {str(e)}"})
                 return []
 
         async def poll_positions():
-            """Poll positions every 5 seconds and send updates"""
+            """Poll positions and send the summary plus per-position updates"""
+            # Running totals are updated from per-position deltas; a full
+            # recompute runs periodically to correct any floating-point drift.
+            position_values = {}
+            total_unrealized_pnl = 0.0
+            total_market_value = 0.0
+            last_full_recompute = 0.0
             while True:
                 try:
                     current_positions = await get_positions_snapshot()
-                    
+
                     if current_positions:
+                        now = asyncio.get_event_loop().time()
+                        changed_positions = []
+                        seen_conids = set()
+                        # Positions without a conid cannot be diffed, add them each poll
+                        untracked_unrealized_pnl = 0.0
+                        untracked_market_value = 0.0
+
+                        for pos in current_positions:
+                            conid = pos.get("conid")
+                            if not conid:
+                                untracked_unrealized_pnl += pos.get("unrealizedPnl") or 0.0
+                                untracked_market_value += pos.get("marketValue") or 0.0
+                                continue
+                            seen_conids.add(conid)
+                            if conid not in last_positions_data or last_positions_data[conid] != pos:
+                                changed_positions.append(pos)
+                                new_values = (pos.get("unrealizedPnl") or 0.0, pos.get("marketValue") or 0.0)
+                                old_values = position_values.get(conid, (0.0, 0.0))
+                                total_unrealized_pnl += new_values[0] - old_values[0]
+                                total_market_value += new_values[1] - old_values[1]
+                                position_values[conid] = new_values
+
+                        # Subtract positions that disappeared since the last poll
+                        for conid in position_values.keys() - seen_conids:
+                            old_values = position_values.pop(conid)
+                            total_unrealized_pnl -= old_values[0]
+                            total_market_value -= old_values[1]
+                            last_positions_data.pop(conid, None)
+
+                        if now - last_full_recompute >= TOTALS_RECOMPUTE_INTERVAL:
+                            total_unrealized_pnl = sum(values[0] for values in position_values.values())
+                            total_market_value = sum(values[1] for values in position_values.values())
+                            last_full_recompute = now
+
                         # Send positions summary
-                        total_unrealized_pnl = sum(p.get("unrealizedPnl", 0) for p in current_positions)
-                        total_market_value = sum(p.get("marketValue", 0) for p in current_positions)
-                        
                         await websocket.send_json({
                             "type": "positions_summary",
                             "data": {
                                 "positions": current_positions,
-                                "totalUnrealizedPnl": total_unrealized_pnl,
-                                "totalMarketValue": total_market_value,
-                                "timestamp": asyncio.get_event_loop().time()
+                                "totalUnrealizedPnl": total_unrealized_pnl + untracked_unrealized_pnl,
+                                "totalMarketValue": total_market_value + untracked_market_value,
+                                "timestamp": now
                             }
                         })
                         
-                        # Check for individual position changes and send updates
-                        for pos in current_positions:
-                            conid = pos.get("conid")
-                            if conid:
-                                # Send individual position update if data changed
-                                if conid not in last_positions_data or last_positions_data[conid] != pos:
-                                    await websocket.send_json({
-                                        "type": "position_update",
-                                        "data": pos
-                                    })
-                                    last_positions_data[conid] = pos.copy()
+                        # Send individual position updates for rows whose data changed
+                        for pos in changed_positions:
+                            await websocket.send_json({
+                                "type": "position_update",
+                                "data": pos
+                            })
+                            last_positions_data[pos.get("conid")] = pos.copy()
                     
-                    await asyncio.sleep(5.0)  # Poll every 5 seconds
+                    await asyncio.sleep(POSITIONS_POLL_INTERVAL)
                 except asyncio.CancelledError:
                     break
                 except Exception as e:
                     await websocket.send_json({"type": "error", "message": f"Polling error: {str(e)}"})
-                    await asyncio.sleep(5.0)
+                    await asyncio.sleep(POSITIONS_POLL_INTERVAL)
 
         async def check_for_orders():
             """Check for orders data"""
@@ -90,30 +146,8 @@ async def websocket_endpoint(websocket: WebSocket):
                     await websocket.send_json({"type": "error", "message": f"Orders polling error: {str(e)}"})
                     await asyncio.sleep(0.1)
 
-        async def check_free_runners():
-            """Monitor free runner tracking orders"""
-            while True:
-                try:
-                    # Get current positions to check conditions
-                    current_positions = await get_positions_snapshot()
-                    
-                    # Check free runner conditions
-                    completed_events = free_runner_service.check_runner_conditions(current_positions)
-                    
-                    # Send completion events
-                    for event in completed_events:
-                        await websocket.send_json(event)
-                    
-                    await asyncio.sleep(2.0)  # Check every 2 seconds for price targets
-                    
-                except asyncio.CancelledError:
-                    break
-                except Exception as e:
-                    await websocket.send_json({"type": "error", "message": f"Free runner error: {str(e)}"})
-                    await asyncio.sleep(2.0)
-
         while True:
-            msg = await websocket.receive_json()
+            msg = await receive_command(websocket)
             action = msg.get("action")
             sub_type = msg.get("type")
 
@@ -134,10 +168,9 @@ async def websocket_endpoint(websocket: WebSocket):
                     await websocket.send_json({"type": "message", "data": "Subscribed to orders"})
                     
                 elif sub_type == "free_runners" and "free_runners" not in active_subs:
-                    # Start free runner monitoring
+                    # Completion events are published by the free runner service's own check task
                     active_subs["free_runners"] = True
-                    if free_runner_task is None or free_runner_task.done():
-                        free_runner_task = asyncio.create_task(check_free_runners())
+                    free_runner_service.subscribe(websocket)
                     await websocket.send_json({"type": "message", "data": "Subscribed to free runner monitoring"})
 
                 elif sub_type == "penny_pnl":
@@ -169,10 +202,7 @@ async def websocket_endpoint(websocket: WebSocket):
                     
                 elif sub_type == "free_runners" and "free_runners" in active_subs:
                     del active_subs["free_runners"]
-                    # Stop free runner monitoring
-                    if free_runner_task and not free_runner_task.done():
-                        free_runner_task.cancel()
-                        free_runner_task = None
+                    free_runner_service.unsubscribe(websocket)
                     await websocket.send_json({"type": "message", "data": "Unsubscribed from free runner monitoring"})
 
                 elif sub_type == "penny_pnl" and "penny_pnl" in active_subs:
@@ -187,7 +217,7 @@ async def websocket_endpoint(websocket: WebSocket):
 
     except WebSocketDisconnect:
         # Cancel all polling tasks on disconnect
-        tasks_to_cancel = [positions_task, orders_task, free_runner_task]
+        tasks_to_cancel = [positions_task, orders_task]
         for task in tasks_to_cancel:
             if task and not task.done():
                 task.cancel()
@@ -195,4 +225,5 @@ async def websocket_endpoint(websocket: WebSocket):
         # Unsubscribe from orders if subscribed
         if "orders" in active_subs:
             ibkr_service.unsubscribe_orders()
+        free_runner_service.unsubscribe(websocket)
         pass
@@ -2,7 +2,7 @@
 Services module for IBKR strategy builder backend
 """
 from .ibkr_service import ibkr_service
-from .free_runner_service import free_runner_service
+from .free_runner_service import get_free_runner_service
 from .stop_loss_service import stop_loss_management_service
 from .notification_service import notification_service
 from .alerter_manager import alerter_manager
@@ -14,6 +14,7 @@ from .order_tracking_service import order_tracking_service
 __all__ = [
     "ibkr_service", 
     "free_runner_service", 
+    "get_free_runner_service",
     "stop_loss_management_service", 
     "notification_service",
     "alerter_manager",
@@ -22,3 +23,13 @@ __all__ = [
     "chat_discovery",
     "order_tracking_service"
 ]
+
+# Importing the submodule bound its name here; drop it so the lazily created
+# service instance below is what `from app.services import free_runner_service` gets
+globals().pop("free_runner_service", None)
+
+
+def __getattr__(name):
+    if name == "free_runner_service":
+        return get_free_runner_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
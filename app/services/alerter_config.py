@@ -1,7 +1,8 @@
 """
 Alerter configuration and management
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+import functools
 import re
 from enum import Enum
 
@@ -13,13 +14,21 @@ class AlerterType(Enum):
     PROF_AND_KIAN_ALERTS = "prof-and-kian-alerts"
 
 # Global list of supported alerters for easy editing
-SUPPORTED_ALERTERS = [
+_SUPPORTED_ALERTERS_LIST = [
     AlerterType.REAL_DAY_TRADING.value,
     AlerterType.NYRLETH.value,
     AlerterType.DEMSLAYER_SPX_ALERTS.value,
-    AlerterType.PROF_AND_KIAN_ALERTS.value
+    AlerterType.PROF_AND_KIAN_ALERTS.value,
+    # Canonical Robindahood alerter (see aliases below)
+    'robindahood-alerts',
 ]
 
+# Frozen views: tuple keeps iteration order, the sets give O(1) membership
+SUPPORTED_ALERTERS = tuple(_SUPPORTED_ALERTERS_LIST)
+_SUPPORTED_SET = frozenset(SUPPORTED_ALERTERS)
+_LOWER_TO_CANON = {alerter.lower(): alerter for alerter in SUPPORTED_ALERTERS}
+_SUPPORTED_LOWER_SET = frozenset(_LOWER_TO_CANON)
+
 # Aliases map (compacted lower -> canonical supported alerter)
 # Add Robindahood aliases so messages/titles containing 'robindahood-alerts' or 'RobinDaHood'
 # will be recognized and normalized to the canonical 'robindahood-alerts'.
@@ -33,9 +42,105 @@ ALIAS_TO_CANONICAL: dict = {
     'demspxslayerandleaps': 'demslayer-spx-alerts',
 }
 
-# Ensure canonical Robindahood alerter is in supported list
-if 'robindahood-alerts' not in SUPPORTED_ALERTERS:
-    SUPPORTED_ALERTERS.append('robindahood-alerts')
+# Used to compact names/messages down to lowercase alphanumerics
+_NON_ALNUM_RE = re.compile(r'[^0-9a-zA-Z]+')
+
+# Titles and short message bodies repeat heavily (channels send the same
+# handle over and over), so the pure detection helpers below are memoized.
+# Messages longer than this are not cached to keep the cache bounded.
+_EXTRACT_CACHE_MAX_LEN = 256
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_cached(alerter_name: str) -> Optional[str]:
+    """Cached implementation of AlerterConfig.normalize_alerter_name"""
+    normalized = alerter_name.strip()
+    
+    # Check for exact match first
+    if normalized in _SUPPORTED_SET:
+        return normalized
+        
+    # Check for case-insensitive match
+    lowered = normalized.lower()
+    if lowered in _SUPPORTED_LOWER_SET:
+        return _LOWER_TO_CANON[lowered]
+    
+    # Check if any supported alerter is contained within the input string
+    for lower_supported, supported in _LOWER_TO_CANON.items():
+        if lower_supported in lowered:
+            return supported
+            
+    # Check alias mapping using a compacted key
+    try:
+        compact = _NON_ALNUM_RE.sub('', normalized).lower()
+        if compact in ALIAS_TO_CANONICAL:
+            return ALIAS_TO_CANONICAL[compact]
+    except Exception:
+        pass
+
+    return None
+
+
+def _build_alerter_regex(alerter: str):
+    """Match the alerter as a standalone token and capture the text after it"""
+    return re.compile(
+        r'(?:^|(?<=[^0-9A-Za-z]))' + re.escape(alerter) + r'(?![0-9A-Za-z])[\s:\-–—]*(.*)',
+        re.IGNORECASE | re.DOTALL,
+    )
+
+
+# One precompiled token regex per supported alerter (checked in list order)
+_ALERTER_REGEXES = [(alerter, _build_alerter_regex(alerter)) for alerter in SUPPORTED_ALERTERS]
+
+# Compacted (alphanumeric, lowercase) names for the noisy-message fallback
+_COMPACT_SUPPORTED = [
+    (_NON_ALNUM_RE.sub('', supported).lower(), supported) for supported in SUPPORTED_ALERTERS
+]
+
+
+def _strip_quotes(text: str) -> str:
+    """Remove one pair of surrounding single or double quotes"""
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in ("'", '"'):
+        return text[1:-1]
+    return text
+
+
+def _extract_alerter(message: str) -> Tuple[Optional[str], str]:
+    """Uncached implementation of AlerterConfig.extract_alerter_from_message"""
+    # Normalize working copy
+    msg = message.strip()
+
+    # Handles variants like "alerter: rest", "alerter rest", "prefix alerter rest"
+    # in a single regex pass per alerter.
+    for alerter, regex in _ALERTER_REGEXES:
+        match = regex.search(msg)
+        if match:
+            return alerter, _strip_quotes(match.group(1).strip())
+
+    # Fallback: sometimes messages contain embedded newlines or noise that
+    # break the token matching above (e.g. "demslayer-s\n\n\nspx-alerts 6500P").
+    # In that case, compact the input by removing non-alphanumeric characters
+    # and try a normalized substring match. If found, return the supported
+    # alerter and the original message (handlers will still extract the
+    # contract info).
+    compact_msg = _NON_ALNUM_RE.sub('', msg).lower()
+    # First check canonical supported names
+    for compact_supported, supported in _COMPACT_SUPPORTED:
+        if compact_supported and compact_supported in compact_msg:
+            return supported, msg
+    # Then check alias mapping
+    for alias_compact, canonical in ALIAS_TO_CANONICAL.items():
+        if alias_compact in compact_msg:
+            return canonical, msg
+
+    return None, message
+
+
+@functools.lru_cache(maxsize=1024)
+def _extract_cached(message: str) -> Tuple[Optional[str], str]:
+    """Cached wrapper around _extract_alerter for short messages"""
+    return _extract_alerter(message)
+
 
 class AlerterConfig:
     """Configuration for alerter management"""
@@ -43,46 +148,21 @@ class AlerterConfig:
     @staticmethod
     def get_supported_alerters() -> List[str]:
         """Get list of supported alerter names"""
-        return SUPPORTED_ALERTERS.copy()
+        return list(SUPPORTED_ALERTERS)
     
     @staticmethod
     def is_supported_alerter(alerter_name: str) -> bool:
         """Check if an alerter name is supported"""
         if not alerter_name:
             return False
-        return alerter_name.strip() in SUPPORTED_ALERTERS
+        return alerter_name.strip() in _SUPPORTED_SET
     
     @staticmethod
     def normalize_alerter_name(alerter_name: str) -> Optional[str]:
         """Normalize alerter name to match our supported list"""
         if not alerter_name:
             return None
-            
-        normalized = alerter_name.strip()
-        
-        # Check for exact match first
-        if normalized in SUPPORTED_ALERTERS:
-            return normalized
-            
-        # Check for case-insensitive match
-        for supported in SUPPORTED_ALERTERS:
-            if normalized.lower() == supported.lower():
-                return supported
-        
-        # Check if any supported alerter is contained within the input string
-        for supported in SUPPORTED_ALERTERS:
-            if supported.lower() in normalized.lower():
-                return supported
-                
-        # Check alias mapping using a compacted key
-        try:
-            compact = re.sub(r'[^0-9a-zA-Z]+', '', normalized).lower()
-            if compact in ALIAS_TO_CANONICAL:
-                return ALIAS_TO_CANONICAL[compact]
-        except Exception:
-            pass
-
-        return None
+        return _normalize_cached(alerter_name)
     
     @staticmethod
     def extract_alerter_from_message(message: str) -> tuple[Optional[str], str]:
@@ -92,70 +172,27 @@ class AlerterConfig:
         """
         if not message:
             return None, message
-        # Normalize working copy
-        msg = message.strip()
+        if len(message) < _EXTRACT_CACHE_MAX_LEN:
+            return _extract_cached(message)
+        return _extract_alerter(message)
 
-        # Check each supported alerter using several patterns so we handle
-        # variants like "alerter: rest", "alerter rest", or messages that
-        # start with the alerter name followed by whitespace/punctuation.
+    @staticmethod
+    def warm_detect_cache() -> None:
+        """Prime the detection caches with the canonical alerter names and aliases.
+
+        All detection regexes are compiled at import; this makes the first
+        alerts for each alerter hit the memoized normalization path too.
+        """
         for alerter in SUPPORTED_ALERTERS:
-            # Pattern 1: explicit 'AlerterName:' marker (existing behavior)
-            if f"{alerter}:" in msg:
-                parts = re.split(re.escape(f"{alerter}:"), msg, flags=re.IGNORECASE)
-                if len(parts) >= 2:
-                    cleaned_message = parts[1].strip()
-                    # Remove surrounding quotes if present
-                    if (cleaned_message.startswith("'") and cleaned_message.endswith("'")) or (cleaned_message.startswith('"') and cleaned_message.endswith('"')):
-                        cleaned_message = cleaned_message[1:-1]
-                    return alerter, cleaned_message
-
-            # Pattern 2: message starts with the alerter name followed by whitespace or punctuation
-            low_msg = msg.lower()
-            low_alerter = alerter.lower()
-            if low_msg.startswith(low_alerter):
-                remainder = msg[len(alerter):].lstrip(" \t-–—:\'\"")
-                cleaned_message = remainder
-                # Strip surrounding quotes
-                if (cleaned_message.startswith("'") and cleaned_message.endswith("'")) or (cleaned_message.startswith('"') and cleaned_message.endswith('"')):
-                    cleaned_message = cleaned_message[1:-1]
-                return alerter, cleaned_message
-
-            # Pattern 3: alerter appears as a standalone token inside the message
-            # e.g. "prefix demslayer-spx-alerts 6500P" -> we want the trailing part
-            idx = low_msg.find(low_alerter)
-            if idx != -1:
-                # Ensure that the matched substring is a token boundary (preceded/followed by space or punctuation)
-                before_ok = (idx == 0) or (not low_msg[idx-1].isalnum())
-                after_idx = idx + len(low_alerter)
-                after_ok = (after_idx >= len(low_msg)) or (not low_msg[after_idx].isalnum())
-                if before_ok and after_ok:
-                    remainder = msg[after_idx:].lstrip(" \t-–—:\'\"")
-                    cleaned_message = remainder
-                    if (cleaned_message.startswith("'") and cleaned_message.endswith("'")) or (cleaned_message.startswith('"') and cleaned_message.endswith('"')):
-                        cleaned_message = cleaned_message[1:-1]
-                    return alerter, cleaned_message
-
-            # Final fallback: sometimes messages contain embedded newlines or
-            # noise that break the literal token matching above (e.g.
-            # "demslayer-s\n\n\nspx-alerts 6500P"). In that case, compact the
-            # input by removing non-alphanumeric characters and try a normalized
-            # substring match. If found, return the supported alerter and the
-            # original message (handlers will still extract the contract info).
-            try:
-                compact_msg = re.sub(r'[^0-9a-zA-Z]+', '', msg).lower()
-                # First check canonical supported names
-                for supported in SUPPORTED_ALERTERS:
-                    compact_supported = re.sub(r'[^0-9a-zA-Z]+', '', supported).lower()
-                    if compact_supported and compact_supported in compact_msg:
-                        return supported, msg
-                # Then check alias mapping
-                for alias_compact, canonical in ALIAS_TO_CANONICAL.items():
-                    if alias_compact in compact_msg:
-                        return canonical, msg
-            except Exception:
-                pass
+            _normalize_cached(alerter)
+        for alias in ALIAS_TO_CANONICAL:
+            _normalize_cached(alias)
 
-            return None, message
+    @staticmethod
+    def clear_caches() -> None:
+        """Clear memoized detection results (call after mutating ALIAS_TO_CANONICAL)"""
+        _normalize_cached.cache_clear()
+        _extract_cached.cache_clear()
     
     @staticmethod
     def detect_alerter(title: str, message: str, subtext: str = None) -> Optional[str]:
@@ -1,9 +1,15 @@
 """
 Alerter management service - routes notifications to appropriate handlers
 """
-from typing import Dict, Any, Optional
+from dataclasses import dataclass
+from datetime import datetime as _datetime
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+import contextlib
 import logging
+import operator
 import asyncio
+import time
 
 from .alerter_config import AlerterConfig, AlerterType
 from .handlers import (
@@ -15,13 +21,196 @@ from .handlers import (
 from .handlers import RobinDaHoodHandler
 from .telegram_service import telegram_service
 
+try:
+    from .ibkr_service import IBKRService
+    from .alerter_stock_storage import alerter_stock_storage
+except ImportError:
+    IBKRService = None
+    alerter_stock_storage = None
+
 logger = logging.getLogger(__name__)
 
+# Seconds a fetched IBKR positions snapshot is reused for enrichment
+POSITIONS_CACHE_TTL = 3.0
+
+# Alerters with their own stored-contract handling that skip IBKR position enrichment
+_ENRICHMENT_SKIP_ALERTERS = frozenset({AlerterType.DEMSLAYER_SPX_ALERTS.value})
+
+# processed_data field -> candidate keys on a matched IBKR position, in priority order
+_FIELD_ALIASES = (
+    ('ibkr_unrealized_pnl', ('unrealizedPnl', 'unrealized', 'unrealized_pnl')),
+    ('ibkr_realized_pnl', ('realizedPnl', 'realized', 'realized_pnl')),
+    ('ibkr_market_value', ('marketValue', 'mktValue', 'market_value')),
+    ('ibkr_avg_price', ('avgPrice', 'avgCost', 'avg_price')),
+)
+_POSITION_QTY_KEYS = ('position', 'pos', 'positionSize')
+_MATCHED_SYMBOL_KEYS = ('_matched_symbol', 'symbol', 'contractDesc')
+_CURRENT_PRICE_KEYS = ('currentPrice', 'mktPrice')
+_CONTRACT_KEYS = ('contract', 'contract_details', 'contractDetails')
+
+# Position fields read by enrichment, fetched in one C-level call per position.
+# Only keys get_formatted_positions always returns, so the itemgetter never misses
+_POS_FIELD_KEYS = (
+    'symbol', 'secType', 'position', 'unrealizedPnl', 'realizedPnl',
+    'marketValue', 'avgPrice', 'currentPrice',
+)
+_POS_FIELDS = operator.itemgetter(*_POS_FIELD_KEYS)
+
+
+# (processed_data key, label, placeholder value to skip) for the Telegram details line
+_ADDITIONAL_INFO_SPEC = (
+    ('action', 'Action', None),
+    ('price', 'Price', 'N/A'),
+    ('signal_type', 'Signal', None),
+    ('confidence', 'Confidence', None),
+    ('entry_point', 'Entry', 'N/A'),
+    ('target', 'Target', 'N/A'),
+)
+
+# Cap on echoed notification fields in error results, so failure storms
+# with kilobyte-sized bodies don't retain the full text
+_MAX_ERROR_FIELD_LEN = 512
+
+_MISSING = object()
+
+
+def _truncate(value: Any, limit: int = _MAX_ERROR_FIELD_LEN) -> Any:
+    """Truncate strings to `limit` characters; other values pass through"""
+    if isinstance(value, str) and len(value) > limit:
+        return value[:limit]
+    return value
+
+
+def _first_present(d: Dict[str, Any], keys: tuple) -> Any:
+    """Return the value of the first key in `keys` present in `d`, else None"""
+    for k in keys:
+        v = d.get(k, _MISSING)
+        if v is not _MISSING:
+            return v
+    return None
+
+
+def _pos_fields(p: Dict[str, Any]) -> tuple:
+    """Return the _POS_FIELD_KEYS values of position `p`, with None for missing keys"""
+    try:
+        return _POS_FIELDS(p)
+    except KeyError:
+        get = p.get
+        return tuple(get(k) for k in _POS_FIELD_KEYS)
+
+
+@dataclass(slots=True)
+class NotificationContext:
+    """Per-notification state passed from routing through enrichment to the Telegram send.
+
+    processed_data stays a plain dict: handlers produce it and TelegramService
+    formats alerts from it.
+    """
+    alerter_name: str
+    title: str
+    message: str
+    subtext: str
+    processed_data: Dict[str, Any]
+    # Positions fetch started alongside the handler, consumed by enrichment
+    positions_task: Optional[asyncio.Task] = None
+
+
+@dataclass
+class PendingSend:
+    """A Telegram trading alert queued for batched delivery"""
+    alerter_name: str
+    message: str
+    ticker: str
+    additional_info: str
+    processed_data: Dict[str, Any]
+    future: asyncio.Future
+
+
+class TelegramBatcher:
+    """Coalesces bursts of Telegram trading alerts into batched sends.
+
+    Alerts are flushed once `max_batch_size` are pending or `max_wait_ms`
+    has elapsed since the first alert of the batch was queued. The
+    background loop starts lazily on the first submit, since the manager
+    is created at import time before an event loop is running.
+    """
+
+    def __init__(self, max_batch_size: int = 8, max_wait_ms: int = 50):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, alerter_name: str, message: str, ticker: str,
+                     additional_info: str, processed_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue an alert and wait for its send result"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_loop())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(PendingSend(alerter_name, message, ticker, additional_info, processed_data, future))
+        return await future
+
+    async def _run_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[PendingSend] = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[PendingSend]):
+        try:
+            results = await telegram_service.send_trading_alerts_batch([
+                {
+                    "alerter_name": pending.alerter_name,
+                    "message": pending.message,
+                    "ticker": pending.ticker,
+                    "additional_info": pending.additional_info,
+                    "processed_data": pending.processed_data,
+                }
+                for pending in batch
+            ])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for pending, result in zip(batch, results):
+            # The submitter may have been cancelled while the batch was in flight
+            if pending.future.done():
+                continue
+            if isinstance(result, BaseException):
+                pending.future.set_exception(result)
+            else:
+                pending.future.set_result(result)
+
+        # A short result list must not leave submitters waiting forever
+        for pending in batch[len(results):]:
+            if not pending.future.done():
+                pending.future.set_exception(
+                    RuntimeError("Telegram batch send returned no result for this alert")
+                )
+
+
 class AlerterManager:
     """Manages routing of notifications to specific alerter handlers"""
-    
-    def __init__(self):
-        self.handlers = {
+
+    # Read-only alerter name -> (handler, handler class name) registry, built
+    # once at import by _build_registry and shared by all instances
+    HANDLERS: Mapping[str, Tuple[Any, str]] = MappingProxyType({})
+
+    @classmethod
+    def _build_registry(cls) -> Mapping[str, Tuple[Any, str]]:
+        """Instantiate the alerter handlers and freeze them into a registry"""
+        handlers = {
             AlerterType.REAL_DAY_TRADING.value: RealDayTradingHandler(),
             AlerterType.NYRLETH.value: NyrlethHandler(),
             AlerterType.DEMSLAYER_SPX_ALERTS.value: DemslayerSpxAlertsHandler(),
@@ -30,9 +219,22 @@ class AlerterManager:
         # Add RobinDaHood handler mapped to its canonical supported name
         # The canonical alerter name is 'robindahood-alerts' (ensured in AlerterConfig)
         try:
-            self.handlers['robindahood-alerts'] = RobinDaHoodHandler()
+            handlers['robindahood-alerts'] = RobinDaHoodHandler()
         except Exception:
             logger.debug('Failed to initialize RobinDaHoodHandler')
+        return MappingProxyType({name: (h, type(h).__name__) for name, h in handlers.items()})
+    
+    def __init__(self):
+        # Detection patterns are precompiled; prime the memoized lookups too
+        AlerterConfig.warm_detect_cache()
+        # Coalesces bursts of outgoing Telegram alerts into batched sends
+        self._telegram_batcher = TelegramBatcher()
+        # IBKR client and short-lived positions snapshot shared by enrichment
+        self._ibkr = None
+        self._positions_cache = {"ts": 0.0, "data": None}
+        self._positions_lock = asyncio.Lock()
+        # Positions of the cached snapshot grouped by uppercased symbol root
+        self._pos_index: Dict[str, List[Dict[str, Any]]] = {}
         
     async def process_notification(self, title: str, message: str, subtext: str) -> Dict[str, Any]:
         """
@@ -64,60 +266,48 @@ class AlerterManager:
                 return self._process_generic_notification(title, message, subtext)
             
             # Route to specific handler
-            handler = self.handlers.get(detected_alerter)
-            if not handler:
+            entry = AlerterManager.HANDLERS.get(detected_alerter)
+            if not entry:
                 logger.error(f"No handler found for alerter: {detected_alerter}")
                 return self._process_generic_notification(title, message, subtext)
+            handler, handler_name = entry
             
             logger.info(f"Routing notification to {detected_alerter} handler")
-            result = handler.process_notification(title, message, subtext)
+            # Speculatively fetch IBKR positions for enrichment while the handler runs
+            positions_task = None
+            if detected_alerter not in _ENRICHMENT_SKIP_ALERTERS:
+                positions_task = asyncio.create_task(self._get_positions_cached())
+                # Enrichment is best-effort; don't surface unretrieved task errors
+                positions_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+            # Handlers make blocking IBKR/HTTP calls; run them off the event loop
+            result = await asyncio.to_thread(handler.process_notification, title, message, subtext)
             
-            # DEBUG: Check if contract was retrieved from API
-            if result.get("data"):
-                processed_data = result.get("data", {})
-                print(f"🔍 DEBUG: Handler result for {detected_alerter}:")
-                print(f"   Contract Info: {processed_data.get('contract_info')}")
-                print(f"   Contract To Use: {processed_data.get('contract_to_use')}")
-                print(f"   Contract Details (IBKR): {processed_data.get('contract_details')}")
-                print(f"   Spread Info (IBKR): {processed_data.get('spread_info')}")
-                print(f"   Ticker (IBKR): {processed_data.get('ticker')}")
-                print(f"   Stored Contract: {processed_data.get('stored_contract')}")
-                print(f"   Storage Stats: {processed_data.get('storage_stats')}")
-                
-                # Specific check for IBKR API retrieval
-                contract_details = processed_data.get('contract_details')
-                if contract_details:
-                    print(f"✅ IBKR CONTRACT API SUCCESS: Retrieved contract details")
-                    print(f"   IBKR ConID: {contract_details.get('conid')}")
-                    print(f"   IBKR Symbol: {contract_details.get('symbol')}")
-                    print(f"   IBKR Strike: {contract_details.get('strike')}")
-                    print(f"   IBKR Right: {contract_details.get('right')}")
-                    print(f"   IBKR Exchange: {contract_details.get('exchange')}")
-                else:
-                    print(f"❌ IBKR CONTRACT API FAILED: No contract details retrieved")
-                
-                spread_info = processed_data.get('spread_info')
-                if spread_info and spread_info.get('bid') != 'N/A':
-                    print(f"✅ IBKR MARKET DATA SUCCESS: Retrieved pricing")
-                    print(f"   Bid: {spread_info.get('bid')}")
-                    print(f"   Ask: {spread_info.get('ask')}")
-                    print(f"   Last: {spread_info.get('last')}")
-                    print(f"   Spread: {spread_info.get('spread')}")
-                else:
-                    print(f"❌ IBKR MARKET DATA FAILED: No pricing retrieved")
-                
-                print(f"=" * 60)
+            # Log what the handler retrieved from IBKR (skipped unless DEBUG is enabled)
+            if logger.isEnabledFor(logging.DEBUG) and result.get("data"):
+                processed_data = result["data"]
+                logger.debug(
+                    "Handler result for %s: contract_info=%s contract_to_use=%s contract_details=%s "
+                    "spread_info=%s ticker=%s stored_contract=%s",
+                    detected_alerter,
+                    processed_data.get('contract_info'),
+                    processed_data.get('contract_to_use'),
+                    processed_data.get('contract_details'),
+                    processed_data.get('spread_info'),
+                    processed_data.get('ticker'),
+                    processed_data.get('stored_contract'),
+                )
             
             # Add routing info to result
             if result.get("data"):
                 result["data"]["routed_to"] = detected_alerter
-                result["data"]["handler_used"] = handler.__class__.__name__
+                result["data"]["handler_used"] = handler_name
             
             # Send to Telegram if processing was successful
             if result.get("success"):
-                telegram_result = await self._send_telegram_alert(
-                    detected_alerter, title, message, subtext, result.get("data", {})
-                )
+                ctx = NotificationContext(detected_alerter, title, message, subtext, result.get("data", {}),
+                                          positions_task=positions_task)
+                telegram_result = await self._send_telegram_alert(ctx)
                 result["data"]["telegram_sent"] = telegram_result
             
             return result
@@ -129,154 +319,88 @@ class AlerterManager:
                 "message": f"Alerter manager error: {str(e)}",
                 "data": {
                     "error_type": "alerter_manager_error",
-                    "original_title": title,
-                    "original_message": message,
-                    "original_subtext": subtext
+                    "original_title": _truncate(title),
+                    "original_message": _truncate(message),
+                    "original_subtext": _truncate(subtext)
                 }
             }
     
-    async def _send_telegram_alert(self, alerter_name: str, title: str, message: str, 
-                                  subtext: str, processed_data: Dict[str, Any]) -> Dict[str, Any]:
-        # print("Sending Telegram alert...")
+    async def _send_telegram_alert(self, ctx: NotificationContext) -> Dict[str, Any]:
         """Send alert to Telegram with Buy/Sell buttons"""
+        if not telegram_service:
+            return {
+                "success": False,
+                "message": "Telegram service not available",
+                "error": "telegram_service_unavailable"
+            }
+        # Skip enrichment entirely while Telegram sends are failing
+        if telegram_service.circuit_open():
+            return {
+                "success": False,
+                "message": "Telegram unavailable (circuit open)",
+                "error": "circuit_open"
+            }
+        alerter_name = ctx.alerter_name
+        message = ctx.message
+        subtext = ctx.subtext
+        processed_data = ctx.processed_data
         try:
             # Extract ticker from processed data if available, fallback to subtext (ticker)
             ticker = processed_data.get('ticker', subtext)
 
+            # Combine message and subtext for display
+            combined_message = message
+            if subtext and subtext.strip() and subtext != ticker and subtext != "NO_SUBTEXT":
+                # Only append subtext if it's different from ticker, not empty, and not placeholder
+                combined_message = f"{message}\n{subtext.strip()}"
+
             # Centralized enrichment: ensure processed_data contains open-position info
-            # for all alerters (except demslayer-spx-alerts) so Telegram formatting is consistent.
-            try:
-                if alerter_name != 'demslayer-spx-alerts':
-                    await self._enrich_processed_data_with_ibkr(alerter_name, title, message, subtext, processed_data)
-            except Exception:
-                # Best-effort enrichment; don't block sending on failures
-                pass
-            
-            # Format additional info from processed data
-            additional_info = []
+            # for all alerters (except demslayer-spx-alerts) so Telegram formatting is
+            # consistent. Alongside it, look for an open IBKR position mentioned in the
+            # combined message. Both are best-effort and run concurrently.
+            enrich_task = None
+            if alerter_name not in _ENRICHMENT_SKIP_ALERTERS:
+                enrich_task = asyncio.create_task(self._enrich_processed_data_with_ibkr(ctx))
+            match_task = None
+            if self._wants_position_match(ctx):
+                match_task = asyncio.create_task(self._match_open_position(combined_message))
             
-            # Add specific info based on processed data
-            if 'action' in processed_data:
-                additional_info.append(f"Action: {processed_data['action']}")
-            if 'price' in processed_data and processed_data['price'] != 'N/A':
-                additional_info.append(f"Price: {processed_data['price']}")
-            if 'signal_type' in processed_data:
-                additional_info.append(f"Signal: {processed_data['signal_type']}")
-            if 'confidence' in processed_data:
-                additional_info.append(f"Confidence: {processed_data['confidence']}")
-            if 'entry_point' in processed_data and processed_data['entry_point'] != 'N/A':
-                additional_info.append(f"Entry: {processed_data['entry_point']}")
-            if 'target' in processed_data and processed_data['target'] != 'N/A':
-                additional_info.append(f"Target: {processed_data['target']}")
+            # Format additional info from processed data while enrichment runs
+            additional_info = [
+                f"{label}: {processed_data[key]}"
+                for key, label, skip_value in _ADDITIONAL_INFO_SPEC
+                if key in processed_data and (skip_value is None or processed_data[key] != skip_value)
+            ]
             
             # Special handling for demslayer-spx-alerts
             if alerter_name == "demslayer-spx-alerts":
                 self._add_demslayer_info(additional_info, processed_data)
             
-            additional_info_str = " | ".join(additional_info) if additional_info else ""
-            
-            # Combine message and subtext for display
-            combined_message = message
-            if subtext and subtext.strip() and subtext != ticker and subtext != "NO_SUBTEXT":
-                # Only append subtext if it's different from ticker, not empty, and not placeholder
-                combined_message = f"{message}\n{subtext.strip()}"
-            
-            # Try a lightweight auto-enrichment: if processed_data lacks a ticker,
-            # ask the TelegramService to find an open IBKR position mentioned in
-            # the combined message. If found, set processed_data['ticker'] so
-            # the downstream send_trading_alert logic can enrich the alert.
-            try:
-                # Skip auto-enrichment for DeMsLayer-style alerts; those have
-                # specialized stored-contract handling and we don't want the
-                # generic position-matcher to override it.
-                try:
-                    is_dem = False
-                    if telegram_service:
-                        is_dem = telegram_service._is_demspxslayer(alerter_name, processed_data, title=title, message=message)
-                except Exception:
-                    is_dem = False
+            additional_info_str = " | ".join(additional_info)
+
+            pending = [task for task in (enrich_task, match_task) if task is not None]
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
 
-                if (not processed_data.get('ticker')) and telegram_service and not is_dem:
+            # Apply the matched position after enrichment so it takes precedence
+            if match_task is not None and not match_task.exception():
+                matched = match_task.result()
+                if matched:
                     try:
-                        matched = telegram_service._find_matching_open_position(combined_message)
-                        if matched:
-                            # Only auto-enrich from matched open positions if that
-                            # matched position's ticker is actually associated with
-                            # this alerter in our alerter_stock_storage. This avoids
-                            # leaking positions/close-buttons across unrelated
-                            # alerters (e.g., showing SPY from RobinDaHood on an NFLX alert).
-                            try:
-                                from app.services.alerter_stock_storage import alerter_stock_storage
-                                # Resolve the matched symbol/ticker candidate
-                                symbol_guess = matched.get('_matched_symbol') or matched.get('symbol') or matched.get('contractDesc')
-                                symbol_key = None
-                                if isinstance(symbol_guess, str):
-                                    # For a contractDesc like 'SPY SEP2025 659 C' take first token as ticker
-                                    symbol_key = symbol_guess.split()[0].upper()
-                                # If we cannot determine a symbol_key, don't enrich
-                                can_enrich = False
-                                if symbol_key:
-                                    try:
-                                        can_enrich = alerter_stock_storage.is_stock_already_alerted(detected_alerter, symbol_key)
-                                    except Exception:
-                                        can_enrich = False
-
-                                if not can_enrich:
-                                    logger.debug(f"Skipping auto-enrichment: matched position '{symbol_guess}' is not registered for alerter '{alerter_name}'")
-                                else:
-                                    # Populate processed_data with IBKR-friendly fields so
-                                    # send_trading_alert will include the IBKR position block
-                                    try:
-                                        if symbol_guess:
-                                            processed_data.setdefault('ticker', symbol_guess)
-
-                                        # Map common position fields (best-effort)
-                                        try:
-                                            pos_qty = matched.get('position') or matched.get('pos') or matched.get('positionSize') or 0
-                                            try:
-                                                pos_qty_val = int(pos_qty)
-                                            except Exception:
-                                                try:
-                                                    pos_qty_val = int(float(pos_qty))
-                                                except Exception:
-                                                    pos_qty_val = 0
-                                        except Exception:
-                                            pos_qty_val = 0
-
-                                        processed_data['ibkr_position_size'] = abs(pos_qty_val)
-                                        processed_data['ibkr_unrealized_pnl'] = matched.get('unrealizedPnl') or matched.get('unrealized') or matched.get('unrealized_pnl')
-                                        processed_data['ibkr_realized_pnl'] = matched.get('realizedPnl') or matched.get('realized') or matched.get('realized_pnl')
-                                        processed_data['ibkr_market_value'] = matched.get('marketValue') or matched.get('mktValue') or matched.get('market_value')
-                                        processed_data['ibkr_avg_price'] = matched.get('avgPrice') or matched.get('avgCost') or matched.get('avg_price')
-                                        processed_data['ibkr_current_price'] = matched.get('currentPrice') or matched.get('mktPrice') or (matched.get('market_data') or {}).get('last') or matched.get('last')
-                                        processed_data['show_close_position_button'] = True
-
-                                        # Attach a contract-ish dict if available so formatting helpers work
-                                        cd = matched.get('contract') or matched.get('contract_details') or matched.get('contractDetails')
-                                        if isinstance(cd, dict):
-                                            processed_data.setdefault('contract_details', cd)
-
-                                        logger.info(f"Auto-enriched ticker from message using open positions: {symbol_guess}")
-                                    except Exception as e:
-                                        logger.debug(f"Error enriching processed_data from matched position: {e}")
-                            except Exception as e:
-                                logger.debug(f"Auto-enrichment stock storage check failed: {e}")
+                        self._apply_matched_position(ctx, matched)
                     except Exception as e:
                         logger.debug(f"Ticker auto-enrichment failed: {e}")
-            except Exception:
-                # Best-effort only; don't block sending on enrichment failures
-                pass
 
             # Send to Telegram
-            print(f"DEBUG: About to send Telegram alert - alerter: {alerter_name}")
-            telegram_result = await telegram_service.send_trading_alert(
+            logger.debug("About to send Telegram alert - alerter: %s", alerter_name)
+            telegram_result = await self._telegram_batcher.submit(
                 alerter_name=alerter_name,
                 message=combined_message,  # Combined message and subtext
                 ticker=ticker,    # Extracted from processed data or fallback to subtext
                 additional_info=additional_info_str,
                 processed_data=processed_data  # Pass processed data for enhanced formatting
             )
-            print(f"DEBUG: Telegram result - success: {telegram_result.get('success', 'unknown')}")
+            logger.debug("Telegram result - success: %s", telegram_result.get('success', 'unknown'))
             
             return telegram_result
             
@@ -287,6 +411,84 @@ class AlerterManager:
                 "message": f"Failed to send Telegram alert: {str(e)}",
                 "error": str(e)
             }
+
+    def _wants_position_match(self, ctx: NotificationContext) -> bool:
+        """Whether to look for an open IBKR position mentioned in the alert text.
+
+        Only alerts whose processed_data lacks a ticker are auto-enriched.
+        """
+        if ctx.processed_data.get('ticker') or not telegram_service or ctx.alerter_name in _ENRICHMENT_SKIP_ALERTERS:
+            return False
+
+        # Skip auto-enrichment for DeMsLayer-style alerts (including renamed
+        # variants not in _ENRICHMENT_SKIP_ALERTERS); those have specialized
+        # stored-contract handling and we don't want the generic
+        # position-matcher to override it.
+        is_dem = False
+        with contextlib.suppress(Exception):
+            is_dem = telegram_service._is_demspxslayer(ctx.alerter_name, ctx.processed_data,
+                                                       title=ctx.title, message=ctx.message)
+        return not is_dem
+
+    async def _match_open_position(self, combined_message: str) -> Optional[Dict[str, Any]]:
+        """Find an open IBKR position mentioned in the message, using the cached snapshot"""
+        positions = None
+        with contextlib.suppress(Exception):
+            positions = await self._get_positions_cached()
+        return await asyncio.to_thread(telegram_service._find_matching_open_position, combined_message, positions)
+
+    def _apply_matched_position(self, ctx: NotificationContext, matched: Dict[str, Any]):
+        """Fill processed_data from an open IBKR position matched in the message.
+
+        Sets processed_data['ticker'] and the IBKR position fields so the
+        downstream send_trading_alert logic includes the IBKR position block.
+        """
+        alerter_name = ctx.alerter_name
+        processed_data = ctx.processed_data
+
+        # Only auto-enrich from matched open positions if that matched
+        # position's ticker is actually associated with this alerter in our
+        # alerter_stock_storage. This avoids leaking positions/close-buttons
+        # across unrelated alerters (e.g., showing SPY from RobinDaHood on an NFLX alert).
+        symbol_guess = _first_present(matched, _MATCHED_SYMBOL_KEYS)
+        symbol_key = None
+        if isinstance(symbol_guess, str) and symbol_guess.split():
+            # For a contractDesc like 'SPY SEP2025 659 C' take first token as ticker
+            symbol_key = symbol_guess.split()[0].upper()
+        can_enrich = False
+        if symbol_key and alerter_stock_storage is not None:
+            with contextlib.suppress(Exception):
+                can_enrich = alerter_stock_storage.is_stock_already_alerted(alerter_name, symbol_key)
+        if not can_enrich:
+            logger.debug(f"Skipping auto-enrichment: matched position '{symbol_guess}' is not registered for alerter '{alerter_name}'")
+            return
+
+        # Populate processed_data with IBKR-friendly fields so
+        # send_trading_alert will include the IBKR position block
+        if symbol_guess:
+            processed_data.setdefault('ticker', symbol_guess)
+
+        pos_qty = _first_present(matched, _POSITION_QTY_KEYS) or 0
+        try:
+            pos_qty_val = int(pos_qty)
+        except (TypeError, ValueError):
+            try:
+                pos_qty_val = int(float(pos_qty))
+            except (TypeError, ValueError):
+                pos_qty_val = 0
+
+        processed_data['ibkr_position_size'] = abs(pos_qty_val)
+        for dst, keys in _FIELD_ALIASES:
+            processed_data[dst] = _first_present(matched, keys)
+        processed_data['ibkr_current_price'] = _first_present(matched, _CURRENT_PRICE_KEYS) or (matched.get('market_data') or {}).get('last') or matched.get('last')
+        processed_data['show_close_position_button'] = True
+
+        # Attach a contract-ish dict if available so formatting helpers work
+        cd = _first_present(matched, _CONTRACT_KEYS)
+        if isinstance(cd, dict):
+            processed_data.setdefault('contract_details', cd)
+
+        logger.info(f"Auto-enriched ticker from message using open positions: {symbol_guess}")
     
     def _add_demslayer_info(self, additional_info: list, processed_data: dict):
         """Add demslayer-specific contract and position info to additional_info"""
@@ -322,77 +524,123 @@ class AlerterManager:
         """Get information about supported alerters"""
         return {
             "supported_alerters": AlerterConfig.get_supported_alerters(),
-            "handler_count": len(self.handlers),
+            "handler_count": len(AlerterManager.HANDLERS),
             "handlers": {
-                alerter: handler.__class__.__name__ 
-                for alerter, handler in self.handlers.items()
+                alerter: handler_name
+                for alerter, (_, handler_name) in AlerterManager.HANDLERS.items()
             }
         }
     
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
-        from datetime import datetime
-        return datetime.now().isoformat()
+        return _datetime.now().isoformat()
 
-    async def _enrich_processed_data_with_ibkr(self, alerter_name: str, title: str, message: str, subtext: str, processed_data: Dict[str, Any]):
+    def _get_ibkr(self):
+        """Return the IBKR service used for enrichment, created on first use"""
+        if self._ibkr is None:
+            if IBKRService is None:
+                raise RuntimeError("IBKRService is not available")
+            self._ibkr = IBKRService()
+        return self._ibkr
+
+    async def _get_positions_cached(self) -> List[Dict[str, Any]]:
+        """Get formatted IBKR positions, refreshed at most every POSITIONS_CACHE_TTL seconds.
+
+        Concurrent alerts wait on a single refresh instead of each hitting IBKR.
+        """
+        cache = self._positions_cache
+        if cache["data"] is not None and time.monotonic() - cache["ts"] < POSITIONS_CACHE_TTL:
+            return cache["data"]
+        async with self._positions_lock:
+            # Another alert may have refreshed the snapshot while we waited
+            if cache["data"] is not None and time.monotonic() - cache["ts"] < POSITIONS_CACHE_TTL:
+                return cache["data"]
+            ibkr = self._get_ibkr()
+            positions = await asyncio.to_thread(ibkr.get_formatted_positions) or []
+            self._pos_index = self._build_position_index(positions)
+            cache["data"] = positions
+            cache["ts"] = time.monotonic()
+            return positions
+
+    @staticmethod
+    def _build_position_index(positions: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Group positions by symbol root, e.g. 'SPY SEP2025 659 C' -> 'SPY'"""
+        index: Dict[str, List[Dict[str, Any]]] = {}
+        for p in positions:
+            parts = str(p.get('symbol') or '').split()
+            if parts:
+                index.setdefault(parts[0].upper(), []).append(p)
+        return index
+
+    async def _enrich_processed_data_with_ibkr(self, ctx: NotificationContext):
         """Best-effort IBKR enrichment to populate open-position fields used by Telegram.
 
         This centralizes the logic so all alerters (except demslayer-spx-alerts) have
-        consistent behavior for showing close buttons and estimated P/L.
+        consistent behavior for showing close buttons and estimated P/L. When
+        `ctx.positions_task` is set (a positions fetch started alongside the handler),
+        its result is awaited instead of fetching again.
         """
-        try:
-            # Keep existing processed_data if provided
-            if processed_data is None:
-                processed_data = {}
+        # Keep existing processed_data if provided
+        if ctx.processed_data is None:
+            ctx.processed_data = {}
+        processed_data = ctx.processed_data
+        subtext = ctx.subtext
 
-            # If the handler already populated position info, skip
-            if processed_data.get('ibkr_position_size'):
-                return
+        # If the handler already populated position info, skip
+        if processed_data.get('ibkr_position_size'):
+            return
 
-            # Determine ticker candidate
-            ticker_candidate = processed_data.get('ticker') or (subtext if subtext and subtext != 'NO_SUBTEXT' else None) or message
-            if not ticker_candidate:
-                return
+        # Determine ticker candidate
+        ticker_candidate = processed_data.get('ticker') or (subtext if subtext and subtext != 'NO_SUBTEXT' else None) or ctx.message
+        if not ticker_candidate:
+            return
 
-            # Ask IBKR for formatted positions and try to match
-            try:
-                from app.services.ibkr_service import IBKRService
-                ibkr = IBKRService()
-                for p in (ibkr.get_formatted_positions() or []):
-                    sec_type = (p.get('secType') or '').upper()
-                    symbol = (p.get('symbol') or '')
-                    try:
-                        pos_qty = int(p.get('position', 0))
-                    except Exception:
-                        pos_qty = 0
-                    if sec_type == 'OPT' and (processed_data.get('ticker') or '').upper() in str(symbol).upper() and pos_qty != 0:
-                        processed_data['ibkr_position_size'] = abs(pos_qty)
-                        processed_data['ibkr_unrealized_pnl'] = p.get('unrealizedPnl')
-                        processed_data['ibkr_realized_pnl'] = p.get('realizedPnl')
-                        processed_data['ibkr_market_value'] = p.get('marketValue') or p.get('mktValue')
-                        processed_data['ibkr_avg_price'] = p.get('avgPrice') or p.get('avgCost')
-                        processed_data['ibkr_current_price'] = p.get('currentPrice') or p.get('mktPrice')
-                        processed_data['show_close_position_button'] = True
-                        # Build option_contracts row for downstream formatting
-                        processed_data.setdefault('option_contracts', [])
-                        processed_data['option_contracts'].append({
-                            'symbol': symbol,
-                            'ticker': processed_data.get('ticker') or symbol.split()[0],
-                            'strike': p.get('strike'),
-                            'side': 'CALL' if (p.get('right') or '').upper().startswith('C') else 'PUT',
-                            'quantity': abs(pos_qty),
-                            'unrealizedPnl': p.get('unrealizedPnl'),
-                            'realizedPnl': p.get('realizedPnl'),
-                            'marketValue': p.get('marketValue') or p.get('mktValue'),
-                            'avgPrice': p.get('avgPrice') or p.get('avgCost'),
-                            'currentPrice': p.get('currentPrice') or p.get('mktPrice')
-                        })
-                        break
-            except Exception:
-                # Best-effort only
-                return
+        # Ask IBKR for formatted positions (best-effort only)
+        try:
+            if ctx.positions_task is not None:
+                await ctx.positions_task
+            else:
+                await self._get_positions_cached()
         except Exception:
             return
 
-# Global instance
+        # Look up the ticker's symbol root in the positions index
+        candidates = self._pos_index.get(str(ticker_candidate).strip().lstrip('$').upper(), [])
+        for p in candidates:
+            symbol, sec_type, pos_qty, upnl, rpnl, mkt_value, avg_price, cur_price = _pos_fields(p)
+            try:
+                pos_qty = int(pos_qty or 0)
+            except (TypeError, ValueError):
+                pos_qty = 0
+            if (sec_type or '').upper() != 'OPT' or pos_qty == 0:
+                continue
+            pget = p.get
+            symbol = symbol or ''
+            mkt_value = mkt_value or pget('mktValue')
+            avg_price = avg_price or pget('avgCost')
+            cur_price = cur_price or pget('mktPrice')
+            processed_data['ibkr_position_size'] = abs(pos_qty)
+            processed_data['ibkr_unrealized_pnl'] = upnl
+            processed_data['ibkr_realized_pnl'] = rpnl
+            processed_data['ibkr_market_value'] = mkt_value
+            processed_data['ibkr_avg_price'] = avg_price
+            processed_data['ibkr_current_price'] = cur_price
+            processed_data['show_close_position_button'] = True
+            # Build option_contracts row for downstream formatting
+            processed_data.setdefault('option_contracts', []).append({
+                'symbol': symbol,
+                'ticker': processed_data.get('ticker') or symbol.split()[0],
+                'strike': pget('strike'),
+                'side': 'CALL' if (pget('right') or '').upper().startswith('C') else 'PUT',
+                'quantity': abs(pos_qty),
+                'unrealizedPnl': upnl,
+                'realizedPnl': rpnl,
+                'marketValue': mkt_value,
+                'avgPrice': avg_price,
+                'currentPrice': cur_price
+            })
+            break
+
+# Handler registry is built once per process, then the global instance
+AlerterManager.HANDLERS = AlerterManager._build_registry()
 alerter_manager = AlerterManager()
@@ -1,15 +1,84 @@
 """
 Stock storage service for tracking alerted stocks across different alerters
 """
+import atexit
 import json
 import os
 import logging
-from app.services.ibkr_service import IBKRService
-from typing import Dict, Any, List, Optional, Set
+import mmap
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Seconds of mutations coalesced into a single write of the storage file
+FLUSH_DELAY = 0.1
+
+
+def _dumps(data: Any) -> bytes:
+    """Serialize storage data to indented JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str)
+    return json.dumps(data, indent=2, default=str).encode()
+
+
+def _read_json(path: str) -> Any:
+    """Parse a storage file, memory-mapping it straight into orjson when available"""
+    with open(path, 'rb') as f:
+        # mmap cannot map an empty file; let the stdlib parser report it
+        if orjson is None or os.fstat(f.fileno()).st_size == 0:
+            return json.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+@dataclass(slots=True)
+class StockRecord:
+    """Stored alert state for one ticker of one alerter"""
+    status: str
+    first_alert_time: str
+    latest_alert_time: str
+    latest_alert_data: Dict[str, Any]
+    closed_time: Optional[str] = None
+    closed_epoch: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StockRecord":
+        """Build a record from its stored JSON form"""
+        return cls(
+            status=data.get("status", "ACTIVE"),
+            first_alert_time=data.get("first_alert_time", ""),
+            latest_alert_time=data.get("latest_alert_time", ""),
+            latest_alert_data=data.get("latest_alert_data") or {},
+            closed_time=data.get("closed_time"),
+            closed_epoch=data.get("closed_epoch"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Stored JSON form; closed fields are only present once the alert is closed"""
+        data = {
+            "status": self.status,
+            "first_alert_time": self.first_alert_time,
+            "latest_alert_time": self.latest_alert_time,
+            "latest_alert_data": self.latest_alert_data,
+        }
+        if self.closed_time is not None:
+            data["closed_time"] = self.closed_time
+        if self.closed_epoch is not None:
+            data["closed_epoch"] = self.closed_epoch
+        return data
+
+
 class AlerterStockStorage:
     """Service for storing and managing alerted stocks per alerter"""
 
@@ -17,7 +86,24 @@ class AlerterStockStorage:
         self.storage_file = storage_file
         self.storage_path = os.path.join(os.getcwd(), "data", storage_file)
         self._ensure_storage_directory()
-        self.stocks = self._load_stocks()
+        # Guards self.stocks (and its derived lookups) across request threads and the flusher
+        self._lock = threading.RLock()
+        with self._lock:
+            self.stocks = self._load_stocks()
+        # alerter -> summed open contract count, dropped whenever that alerter's stocks change
+        self._contract_count_cache: Dict[str, int] = {}
+        # alerter -> tickers currently ACTIVE, kept in step with self.stocks
+        # Values are unused; dicts keep the tickers in stored (insertion) order
+        self._active_by_alerter: Dict[str, Dict[str, None]] = defaultdict(dict)
+        self._rebuild_active_index()
+
+        # Mutations mark the store dirty; a background thread writes it out
+        self._dirty = False
+        self._save_lock = threading.Lock()
+        self._flush_event = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="alerter-stock-storage-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
 
     def _ensure_storage_directory(self):
         """Ensure the data directory exists"""
@@ -26,14 +112,17 @@ class AlerterStockStorage:
             os.makedirs(data_dir)
             logger.info(f"Created data directory: {data_dir}")
 
-    def _load_stocks(self) -> Dict[str, Dict[str, Any]]:
+    def _load_stocks(self) -> Dict[str, Dict[str, StockRecord]]:
         """Load stocks from storage file"""
         try:
             if os.path.exists(self.storage_path):
-                with open(self.storage_path, 'r') as f:
-                    data = json.load(f)
-                    logger.info(f"Loaded alerted stocks from {self.storage_path}")
-                    return data
+                data = _read_json(self.storage_path)
+                stocks = {
+                    alerter_name: {ticker: StockRecord.from_dict(record) for ticker, record in tickers.items()}
+                    for alerter_name, tickers in data.items()
+                }
+                logger.info(f"Loaded alerted stocks from {self.storage_path}")
+                return stocks
             else:
                 logger.info(f"No existing stocks file found at {self.storage_path}")
                 return {}
@@ -41,121 +130,92 @@ class AlerterStockStorage:
             logger.error(f"Error loading stocks: {e}")
             return {}
     
-    def _save_stocks(self):
+    def _rebuild_active_index(self):
+        """Rebuild the ACTIVE ticker index from the loaded stocks"""
+        self._active_by_alerter.clear()
+        for alerter_name, stocks in self.stocks.items():
+            for ticker, record in stocks.items():
+                if record.status == "ACTIVE":
+                    self._active_by_alerter[alerter_name][ticker] = None
+
+    def _save_stocks(self) -> bool:
         """Save stocks to storage file"""
         try:
-            with open(self.storage_path, 'w') as f:
-                json.dump(self.stocks, f, indent=2, default=str)
+            # Write a temp file and swap it in so a crash never leaves a truncated file
+            tmp_path = self.storage_path + ".tmp"
+            # Serialize a coherent snapshot, then write without holding up mutations
+            with self._lock:
+                payload = _dumps(self._to_dict())
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.storage_path)
             logger.info(f"Saved alerted stocks to {self.storage_path}")
+            return True
         except Exception as e:
             logger.error(f"Error saving stocks: {e}")
-    
-    def remove_stock_alert(self, alerter_name: str, ticker: str) -> bool:
-        """
-        Completely remove a stock alert from storage
-        Args:
-            alerter_name: Name of the alerter
-            ticker: Stock ticker symbol
-        Returns:
-            True if removed successfully, False if not found or error
-        """
-
-        if alerter_name not in self.stocks:
             return False
-        if ticker not in self.stocks[alerter_name]:
-            return False
-        del self.stocks[alerter_name][ticker]
-        # Clean up empty alerter entries
-        if not self.stocks[alerter_name]:
-            del self.stocks[alerter_name]
-        self._save_stocks()
-        logger.info(f"Removed stock alert for {alerter_name}: {ticker}")
-        return True
 
-    def get_total_open_contracts(self, alerter_name: str) -> Dict[str, Any]:
-        """
-        For Real Day Trading: Return a summary of open option contracts for tickers stored for the alerter using IBKR positions.
-        Includes total contract count, and a list of contracts with symbol, strike, side, quantity, and P/L info.
-        """
-        if alerter_name not in self.stocks:
-            return {"total_contracts": 0, "contracts": []}
-        tickers = set(self.stocks[alerter_name].keys())
-        ibkr = IBKRService()
-        positions = ibkr.get_positions()
-        contracts = []
-        total_contracts = 0
-        for pos in positions:
-            sec_type = pos.get("assetClass") or pos.get("secType")
-            symbol = pos.get("contractDesc") or pos.get("symbol")
-            position_qty = abs(int(pos.get("position", 0)))
-            # Option contracts
-            if sec_type and sec_type.upper() == "OPT" and symbol and position_qty > 0:
-                for ticker in tickers:
-                    if ticker and symbol and ticker.upper() in symbol.upper():
-                        parts = symbol.split()
-                        strike = None
-                        side = None
-                        for part in parts:
-                            if part.replace('.', '', 1).isdigit():
-                                strike = part
-                            elif part.upper() in ["C", "P"]:
-                                side = "CALL" if part.upper() == "C" else "PUT"
-                        contracts.append({
-                            "symbol": symbol,
-                            "ticker": ticker,
-                            "strike": strike,
-                            "side": side,
-                            "quantity": position_qty,
-                            "unrealizedPnl": pos.get("unrealizedPnl"),
-                            "realizedPnl": pos.get("realizedPnl"),
-                            "marketValue": pos.get("mktValue"),
-                            "avgPrice": pos.get("avgPrice"),
-                            "currentPrice": pos.get("mktPrice")
-                        })
-                        total_contracts += position_qty
-                        break
-            # Stock positions: add as contract entry with P/L and price info
-            elif sec_type and sec_type.upper() == "STK" and symbol and position_qty > 0:
-                for ticker in tickers:
-                    if ticker and (ticker.upper() == symbol.upper() or ticker.upper() in symbol.upper()):
-                        contracts.append({
-                            "symbol": symbol,
-                            "ticker": ticker,
-                            "quantity": position_qty,
-                            "unrealizedPnl": pos.get("unrealizedPnl"),
-                            "realizedPnl": pos.get("realizedPnl"),
-                            "marketValue": pos.get("mktValue"),
-                            "avgPrice": pos.get("avgPrice"),
-                            "currentPrice": pos.get("mktPrice")
-                        })
-                        total_contracts += position_qty
-                        break
-        return {"total_contracts": total_contracts, "contracts": contracts}
+    def _to_dict(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Plain-dict form of all stored records"""
+        return {
+            alerter_name: {ticker: record.to_dict() for ticker, record in tickers.items()}
+            for alerter_name, tickers in self.stocks.items()
+        }
+
+    def _mark_dirty(self):
+        """Schedule a save of the current stocks on the flusher thread"""
+        self._dirty = True
+        self._flush_event.set()
 
+    def _flush_loop(self):
+        """Write the store once per burst of mutations"""
+        while True:
+            self._flush_event.wait()
+            time.sleep(FLUSH_DELAY)
+            self._flush_event.clear()
+            self.flush()
+
+    def flush(self):
+        """Write pending changes to disk now"""
+        with self._save_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            if not self._save_stocks():
+                # Keep the changes pending so the next flush retries them
+                self._dirty = True
+    
     def cleanup_old_alerts(self, days_old: int = 30):
         """
         Clean up old closed alerts (optional maintenance function)
         Args:
             days_old: Remove closed alerts older than this many days
         """
-        from datetime import timedelta
-        cutoff_date = datetime.now() - timedelta(days=days_old)
-        removed_count = 0
-        for alerter_name in list(self.stocks.keys()):
-            for ticker in list(self.stocks[alerter_name].keys()):
-                stock_data = self.stocks[alerter_name][ticker]
-                if stock_data.get("status") == "CLOSED":
-                    closed_time_str = stock_data.get("closed_time")
-                    if closed_time_str:
-                        try:
-                            closed_time = datetime.fromisoformat(closed_time_str.replace('Z', '+00:00'))
-                            if closed_time < cutoff_date:
-                                self.remove_stock_alert(alerter_name, ticker)
-                                removed_count += 1
-                        except ValueError:
-                            continue
-        if removed_count > 0:
-            logger.info(f"Cleaned up {removed_count} old closed alerts")
+        with self._lock:
+            cutoff_epoch = time.time() - days_old * 86400
+            removed_count = 0
+            for alerter_name in list(self.stocks.keys()):
+                for ticker in list(self.stocks[alerter_name].keys()):
+                    record = self.stocks[alerter_name][ticker]
+                    if record.status == "CLOSED":
+                        closed_epoch = record.closed_epoch
+                        if closed_epoch is None:
+                            # Records closed before closed_epoch was stored only have the ISO time
+                            closed_time_str = record.closed_time
+                            if not closed_time_str:
+                                continue
+                            try:
+                                closed_epoch = datetime.fromisoformat(closed_time_str.replace('Z', '+00:00')).timestamp()
+                            except ValueError:
+                                continue
+                        if closed_epoch < cutoff_epoch and self._remove_stock_alert_nosave(alerter_name, ticker):
+                            removed_count += 1
+            if removed_count > 0:
+                # One save for the whole pass
+                self._mark_dirty()
+                logger.info(f"Cleaned up {removed_count} old closed alerts")
     
     def is_stock_already_alerted(self, alerter_name: str, ticker: str) -> bool:
         """
@@ -169,15 +229,7 @@ class AlerterStockStorage:
             True if already alerted and active, False otherwise
         """
         try:
-            if alerter_name not in self.stocks:
-                return False
-            
-            stock_data = self.stocks[alerter_name].get(ticker)
-            if not stock_data:
-                return False
-            
-            return stock_data.get("status") == "ACTIVE"
-            
+            return ticker in self._active_by_alerter.get(alerter_name, ())
         except Exception as e:
             logger.error(f"Error checking if stock is alerted for {alerter_name}/{ticker}: {e}")
             return False
@@ -194,26 +246,32 @@ class AlerterStockStorage:
         Returns:
             True if closed successfully, False if not found or error
         """
-        try:
-            if alerter_name not in self.stocks:
-                logger.warning(f"No stocks found for alerter: {alerter_name}")
-                return False
-            
-            if ticker not in self.stocks[alerter_name]:
-                logger.warning(f"Stock {ticker} not found for alerter: {alerter_name}")
+        with self._lock:
+            try:
+                bucket = self.stocks.get(alerter_name)
+                if bucket is None:
+                    logger.warning(f"No stocks found for alerter: {alerter_name}")
+                    return False
+                
+                record = bucket.get(ticker)
+                if record is None:
+                    logger.warning(f"Stock {ticker} not found for alerter: {alerter_name}")
+                    return False
+                
+                # Mark as closed and add close timestamp
+                record.status = "CLOSED"
+                record.closed_time = datetime.now().isoformat()
+                record.closed_epoch = time.time()
+                self._active_by_alerter[alerter_name].pop(ticker, None)
+                
+                self._contract_count_cache.pop(alerter_name, None)
+                self._mark_dirty()
+                logger.info(f"Closed stock alert for {alerter_name}: {ticker}")
+                return True
+                
+            except Exception as e:
+                logger.error(f"Error closing stock alert for {alerter_name}/{ticker}: {e}")
                 return False
-            
-            # Mark as closed and add close timestamp
-            self.stocks[alerter_name][ticker]["status"] = "CLOSED"
-            self.stocks[alerter_name][ticker]["closed_time"] = datetime.now().isoformat()
-            
-            self._save_stocks()
-            logger.info(f"Closed stock alert for {alerter_name}: {ticker}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error closing stock alert for {alerter_name}/{ticker}: {e}")
-            return False
     
     def remove_stock_alert(self, alerter_name: str, ticker: str) -> bool:
         """
@@ -226,51 +284,63 @@ class AlerterStockStorage:
         Returns:
             True if removed successfully, False if not found or error
         """
-        try:
-            if alerter_name not in self.stocks:
-                return False
-            
-            if ticker not in self.stocks[alerter_name]:
+        with self._lock:
+            try:
+                if not self._remove_stock_alert_nosave(alerter_name, ticker):
+                    return False
+                self._mark_dirty()
+                logger.info(f"Removed stock alert for {alerter_name}: {ticker}")
+                return True
+            except Exception as e:
+                logger.error(f"Error removing stock alert for {alerter_name}/{ticker}: {e}")
                 return False
-            
-            del self.stocks[alerter_name][ticker]
-            
-            # Clean up empty alerter entries
-            if not self.stocks[alerter_name]:
-                del self.stocks[alerter_name]
-            return True
-        except Exception as e:
-            logger.error(f"Error removing stock alert for {alerter_name}/{ticker}: {e}")
+
+    def _remove_stock_alert_nosave(self, alerter_name: str, ticker: str) -> bool:
+        """Remove a stock alert from memory without scheduling a save"""
+        bucket = self.stocks.get(alerter_name)
+        if bucket is None or bucket.pop(ticker, None) is None:
             return False
+        self._active_by_alerter[alerter_name].pop(ticker, None)
+        
+        # Clean up empty alerter entries
+        if not bucket:
+            del self.stocks[alerter_name]
+        self._contract_count_cache.pop(alerter_name, None)
+        return True
 
     def get_total_open_contracts(self, alerter_name: str) -> int:
         """
         Get the total number of open contracts for all tickers currently stored for the given alerter.
         Sums the latest contract_count (or quantity, or defaults to 1) for each ticker.
+        The result is cached per alerter until its stocks are next modified.
         """
-
-        total_contracts = 0
-        if alerter_name not in self.stocks:
-            return 0
-        for ticker, stock_data in self.stocks[alerter_name].items():
-            alert_data = stock_data.get("latest_alert_data", {})
-            contract_count = alert_data.get("contract_count")
-            quantity = alert_data.get("quantity")
-            try:
-                if contract_count is not None:
-                    total_contracts += int(contract_count)
-                elif quantity is not None:
-                    total_contracts += int(quantity)
-                else:
+        with self._lock:
+            cached = self._contract_count_cache.get(alerter_name)
+            if cached is not None:
+                return cached
+            total_contracts = 0
+            if alerter_name not in self.stocks:
+                return 0
+            for ticker, record in self.stocks[alerter_name].items():
+                alert_data = record.latest_alert_data or {}
+                contract_count = alert_data.get("contract_count")
+                quantity = alert_data.get("quantity")
+                try:
+                    if contract_count is not None:
+                        total_contracts += int(contract_count)
+                    elif quantity is not None:
+                        total_contracts += int(quantity)
+                    else:
+                        total_contracts += 1
+                except Exception:
                     total_contracts += 1
-            except Exception:
-                total_contracts += 1
-        return total_contracts
+            self._contract_count_cache[alerter_name] = total_contracts
+            return total_contracts
     
 
     def get_all_stocks(self) -> Dict[str, Dict[str, Any]]:
         """Get all stocks across all alerters"""
-        return self.stocks.copy()
+        return self._to_dict()
 
     def get_storage_stats(self) -> Dict[str, Any]:
         """Get storage statistics"""
@@ -281,8 +351,9 @@ class AlerterStockStorage:
             "alerters": {}
         }
         for alerter_name, stocks in self.stocks.items():
-            active_count = sum(1 for stock in stocks.values() if stock.get("status") == "ACTIVE")
-            closed_count = sum(1 for stock in stocks.values() if stock.get("status") == "CLOSED")
+            # Records are either ACTIVE or CLOSED, so the active index gives both counts
+            active_count = len(self._active_by_alerter.get(alerter_name, ()))
+            closed_count = len(stocks) - active_count
             stats["alerters"][alerter_name] = {
                 "total_stocks": len(stocks),
                 "active_stocks": active_count,
@@ -298,50 +369,57 @@ class AlerterStockStorage:
         Returns True if this ticker was newly added or re-activated, False if it updated
         an existing active alert or an error occurred.
         """
-        try:
-            if not alerter_name or not ticker:
-                return False
+        with self._lock:
+            try:
+                if not alerter_name or not ticker:
+                    return False
 
-            now_iso = datetime.now().isoformat()
+                now_iso = datetime.now().isoformat()
 
-            if alerter_name not in self.stocks:
-                self.stocks[alerter_name] = {}
-
-            existing = self.stocks[alerter_name].get(ticker)
-            was_new = False
-
-            # If there is no existing entry or it was closed, consider this a new alert
-            if not existing or existing.get("status") != "ACTIVE":
-                was_new = True
-                record = {
-                    "status": "ACTIVE",
-                    "first_alert_time": now_iso,
-                    "latest_alert_time": now_iso,
-                    "latest_alert_data": alert_data
-                }
-            else:
-                # Update existing active record
-                record = existing
-                record["latest_alert_time"] = now_iso
-                record["latest_alert_data"] = alert_data
-
-            self.stocks[alerter_name][ticker] = record
-            # persist
-            self._save_stocks()
-            logger.info(f"Added/updated stock alert for {alerter_name}: {ticker}")
-            return was_new
-        except Exception as e:
-            logger.error(f"Error adding stock alert for {alerter_name}/{ticker}: {e}")
-            return False
+                if alerter_name not in self.stocks:
+                    self.stocks[alerter_name] = {}
+
+                existing = self.stocks[alerter_name].get(ticker)
+                was_new = False
+
+                # If there is no existing entry or it was closed, consider this a new alert
+                if not existing or existing.status != "ACTIVE":
+                    was_new = True
+                    record = StockRecord(
+                        status="ACTIVE",
+                        first_alert_time=now_iso,
+                        latest_alert_time=now_iso,
+                        latest_alert_data=alert_data
+                    )
+                else:
+                    # Update existing active record
+                    record = existing
+                    record.latest_alert_time = now_iso
+                    record.latest_alert_data = alert_data
+
+                self.stocks[alerter_name][ticker] = record
+                if existing is not None and was_new:
+                    # A reopened ticker keeps its stored position, so re-derive the order
+                    self._active_by_alerter[alerter_name] = {
+                        t: None for t, r in self.stocks[alerter_name].items() if r.status == "ACTIVE"
+                    }
+                else:
+                    self._active_by_alerter[alerter_name][ticker] = None
+                self._contract_count_cache.pop(alerter_name, None)
+                # persist
+                self._mark_dirty()
+                logger.info(f"Added/updated stock alert for {alerter_name}: {ticker}")
+                return was_new
+            except Exception as e:
+                logger.error(f"Error adding stock alert for {alerter_name}/{ticker}: {e}")
+                return False
 
     def get_active_stocks(self, alerter_name: str) -> List[str]:
         """
         Return a list of ticker symbols that are currently marked ACTIVE for the given alerter.
         """
         try:
-            if alerter_name not in self.stocks:
-                return []
-            return [ticker for ticker, data in self.stocks[alerter_name].items() if data.get("status") == "ACTIVE"]
+            return list(self._active_by_alerter.get(alerter_name, ()))
         except Exception as e:
             logger.error(f"Error getting active stocks for {alerter_name}: {e}")
             return []
@@ -355,8 +433,8 @@ class AlerterStockStorage:
             if alerter_name not in self.stocks:
                 return {}
             if status is None:
-                return self.stocks[alerter_name].copy()
-            filtered = {t: d for t, d in self.stocks[alerter_name].items() if d.get("status") == status}
+                return {t: r.to_dict() for t, r in self.stocks[alerter_name].items()}
+            filtered = {t: r.to_dict() for t, r in self.stocks[alerter_name].items() if r.status == status}
             return filtered
         except Exception as e:
             logger.error(f"Error getting alerter stocks for {alerter_name} (status={status}): {e}")
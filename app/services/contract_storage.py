@@ -1,14 +1,56 @@
 """
 Contract storage service for persisting alerter contracts across server restarts
 """
+import atexit
 import json
 import os
 import logging
+import mmap
+import re
+import threading
+import time
 from typing import Dict, Any, Optional
 from datetime import datetime, date
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Seconds of mutations coalesced into a single write of the storage file
+FLUSH_DELAY = 0.1
+
+# Alias resolution patterns for get_contract
+_SUFFIX_RE = re.compile(r"[-_. ]?(alerts|alert|handler)$", re.IGNORECASE)
+_SPLIT_RE = re.compile(r"[^A-Za-z0-9]+")
+_NONALNUM_RE = re.compile(r"[^A-Za-z0-9]")
+
+
+def _dumps(data: Any) -> bytes:
+    """Serialize storage data to indented JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str)
+    return json.dumps(data, indent=2, default=str).encode()
+
+
+def _read_json(path: str) -> Any:
+    """Parse a storage file, memory-mapping it straight into orjson when available"""
+    with open(path, 'rb') as f:
+        # mmap cannot map an empty file; let the stdlib parser report it
+        if orjson is None or os.fstat(f.fileno()).st_size == 0:
+            return json.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+def _normalize_alnum(s: str) -> str:
+    """Lowercase alphanumeric-only form of an alerter key"""
+    return _NONALNUM_RE.sub("", str(s or "")).lower()
+
+
 class ContractStorage:
     """Service for storing and retrieving alerter contracts"""
     
@@ -16,7 +58,23 @@ class ContractStorage:
         self.storage_file = storage_file
         self.storage_path = os.path.join(os.getcwd(), "data", storage_file)
         self._ensure_storage_directory()
-        self.contracts = self._load_contracts()
+        # Guards self.contracts (and its derived lookups) across request threads and the flusher
+        self._lock = threading.RLock()
+        with self._lock:
+            self.contracts = self._load_contracts()
+        # Normalized alphanumeric key -> stored key, for alias lookups in get_contract
+        self._norm_index: Dict[str, str] = {}
+        self._rebuild_norm_index()
+        # Requested alerter name -> resolved stored key (or None), cleared on every mutation
+        self._alias_cache: Dict[str, Optional[str]] = {}
+
+        # Mutations mark the store dirty; a background thread writes it out
+        self._dirty = False
+        self._save_lock = threading.Lock()
+        self._flush_event = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="contract-storage-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
     
     def _ensure_storage_directory(self):
         """Ensure the data directory exists"""
@@ -29,10 +87,9 @@ class ContractStorage:
         """Load contracts from storage file"""
         try:
             if os.path.exists(self.storage_path):
-                with open(self.storage_path, 'r') as f:
-                    data = json.load(f)
-                    logger.info(f"Loaded {len(data)} stored contracts from {self.storage_path}")
-                    return data
+                data = _read_json(self.storage_path)
+                logger.info(f"Loaded {len(data)} stored contracts from {self.storage_path}")
+                return data
             else:
                 logger.info(f"No existing contracts file found at {self.storage_path}")
                 return {}
@@ -40,14 +97,53 @@ class ContractStorage:
             logger.error(f"Error loading contracts: {e}")
             return {}
     
-    def _save_contracts(self):
+    def _rebuild_norm_index(self):
+        """Rebuild the normalized key index; the first stored key wins on collisions"""
+        self._norm_index = {}
+        for key in self.contracts:
+            self._norm_index.setdefault(_normalize_alnum(key), key)
+
+    def _save_contracts(self) -> bool:
         """Save contracts to storage file"""
         try:
-            with open(self.storage_path, 'w') as f:
-                json.dump(self.contracts, f, indent=2, default=str)
+            # Write a temp file and swap it in so a crash never leaves a truncated file
+            tmp_path = self.storage_path + ".tmp"
+            # Serialize a coherent snapshot, then write without holding up mutations
+            with self._lock:
+                payload = _dumps(self.contracts)
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.storage_path)
             logger.info(f"Saved {len(self.contracts)} contracts to {self.storage_path}")
+            return True
         except Exception as e:
             logger.error(f"Error saving contracts: {e}")
+            return False
+
+    def _mark_dirty(self):
+        """Schedule a save of the current contracts on the flusher thread"""
+        self._dirty = True
+        self._flush_event.set()
+
+    def _flush_loop(self):
+        """Write the store once per burst of mutations"""
+        while True:
+            self._flush_event.wait()
+            time.sleep(FLUSH_DELAY)
+            self._flush_event.clear()
+            self.flush()
+
+    def flush(self):
+        """Write pending changes to disk now"""
+        with self._save_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            if not self._save_contracts():
+                # Keep the changes pending so the next flush retries them
+                self._dirty = True
     
     def store_contract(self, alerter_name: str, contract_info: Dict[str, Any]):
         """
@@ -57,22 +153,24 @@ class ContractStorage:
             alerter_name: Name of the alerter (e.g., "demslayer-spx-alerts")
             contract_info: Contract information to store
         """
-        try:
-            # Add metadata
-            contract_with_metadata = {
-                **contract_info,
-                "stored_at": datetime.now().isoformat(),
-                "alerter": alerter_name
-            }
-            
-            self.contracts[alerter_name] = contract_with_metadata
-            self._save_contracts()
-            
-            logger.info(f"Stored contract for {alerter_name}: {contract_info}")
-            print(f"DEBUG: Stored contract for {alerter_name}: {contract_info}")
-            
-        except Exception as e:
-            logger.error(f"Error storing contract for {alerter_name}: {e}")
+        with self._lock:
+            try:
+                # Add metadata
+                contract_with_metadata = {
+                    **contract_info,
+                    "stored_at": datetime.now().isoformat(),
+                    "alerter": alerter_name
+                }
+                
+                self.contracts[alerter_name] = contract_with_metadata
+                self._norm_index.setdefault(_normalize_alnum(alerter_name), alerter_name)
+                self._alias_cache.clear()
+                self._mark_dirty()
+                
+                logger.info(f"Stored contract for {alerter_name}: {contract_info}")
+                
+            except Exception as e:
+                logger.error(f"Error storing contract for {alerter_name}: {e}")
     
     def get_contract(self, alerter_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -84,64 +182,66 @@ class ContractStorage:
         Returns:
             Contract info or None if not found
         """
-        try:
-            # Direct hit
-            contract = self.contracts.get(alerter_name)
-            if contract:
-                logger.info(f"Retrieved stored contract for {alerter_name}: {contract}")
-                print(f"DEBUG: Retrieved stored contract for {alerter_name}: {contract}")
-                return contract
+        with self._lock:
+            try:
+                # Name already resolved since the last mutation
+                if alerter_name in self._alias_cache:
+                    resolved_key = self._alias_cache[alerter_name]
+                    return self.contracts.get(resolved_key) if resolved_key is not None else None
 
-            # Try normalized variants to tolerate alerter naming differences
-            norm = str(alerter_name or '').strip()
-            # 1) lowercase key
-            try_keys = [norm, norm.lower()]
+                # Direct hit
+                contract = self.contracts.get(alerter_name)
+                if contract:
+                    self._alias_cache[alerter_name] = alerter_name
+                    logger.debug(f"Retrieved stored contract for {alerter_name}: {contract}")
+                    return contract
 
-            # 2) strip common suffixes like '-alerts', '_alerts', 'alerts'
-            import re
-            base = re.sub(r"[-_. ]?(alerts|alert|handler)$", "", norm, flags=re.IGNORECASE)
-            if base and base not in try_keys:
-                try_keys.append(base)
+                # Try normalized variants to tolerate alerter naming differences
+                norm = str(alerter_name or '').strip()
+                # 1) lowercase key
+                try_keys = [norm, norm.lower()]
 
-            # 3) also try title/camelcase form (e.g., robindahood -> RobinDaHood)
-            try:
-                camel = ''.join(p.capitalize() for p in re.split(r'[^A-Za-z0-9]+', base) if p)
-                if camel and camel not in try_keys:
-                    try_keys.append(camel)
-            except Exception:
-                pass
+                # 2) strip common suffixes like '-alerts', '_alerts', 'alerts'
+                base = _SUFFIX_RE.sub("", norm)
+                if base and base not in try_keys:
+                    try_keys.append(base)
 
-            for k in try_keys:
-                if k in self.contracts:
-                    contract = self.contracts.get(k)
-                    logger.info(f"Retrieved stored contract for alias {alerter_name} -> {k}: {contract}")
-                    print(f"DEBUG: Retrieved stored contract for alias {alerter_name} -> {k}: {contract}")
-                    return contract
+                # 3) also try title/camelcase form (e.g., robindahood -> RobinDaHood)
+                try:
+                    camel = ''.join(p.capitalize() for p in _SPLIT_RE.split(base) if p)
+                    if camel and camel not in try_keys:
+                        try_keys.append(camel)
+                except Exception:
+                    pass
 
-            # As a final fallback, compare normalized alphanumeric lowercase forms
-            # so that variants like 'robindahood-alerts' match stored keys like 'RobinDaHood'
-            try:
-                def _normalize_alnum(s: str) -> str:
-                    return re.sub(r"[^A-Za-z0-9]", "", str(s or "")).lower()
+                for k in try_keys:
+                    if k in self.contracts:
+                        contract = self.contracts.get(k)
+                        self._alias_cache[alerter_name] = k
+                        logger.debug(f"Retrieved stored contract for alias {alerter_name} -> {k}: {contract}")
+                        return contract
 
-                # Prefer using the base (with common suffixes stripped) so that
-                # 'robindahood-alerts' -> 'robindahood' will match stored 'RobinDaHood'
-                target_norm = _normalize_alnum(base if base else norm)
-                for stored_key in self.contracts.keys():
-                    if _normalize_alnum(stored_key) == target_norm:
+                # As a final fallback, compare normalized alphanumeric lowercase forms
+                # so that variants like 'robindahood-alerts' match stored keys like 'RobinDaHood'
+                try:
+                    # Prefer using the base (with common suffixes stripped) so that
+                    # 'robindahood-alerts' -> 'robindahood' will match stored 'RobinDaHood'
+                    target_norm = _normalize_alnum(base if base else norm)
+                    stored_key = self._norm_index.get(target_norm)
+                    if stored_key is not None and stored_key in self.contracts:
                         contract = self.contracts.get(stored_key)
-                        logger.info(f"Retrieved stored contract for normalized alias {alerter_name} -> {stored_key}: {contract}")
-                        print(f"DEBUG: Retrieved stored contract for normalized alias {alerter_name} -> {stored_key}: {contract}")
+                        self._alias_cache[alerter_name] = stored_key
+                        logger.debug(f"Retrieved stored contract for normalized alias {alerter_name} -> {stored_key}: {contract}")
                         return contract
-            except Exception:
-                pass
+                except Exception:
+                    pass
 
-            logger.info(f"No stored contract found for {alerter_name} (tried aliases: {try_keys})")
-            print(f"DEBUG: No stored contract found for {alerter_name} (tried aliases: {try_keys})")
-            return None
-        except Exception as e:
-            logger.error(f"Error retrieving contract for {alerter_name}: {e}")
-            return None
+                logger.info(f"No stored contract found for {alerter_name} (tried aliases: {try_keys})")
+                self._alias_cache[alerter_name] = None
+                return None
+            except Exception as e:
+                logger.error(f"Error retrieving contract for {alerter_name}: {e}")
+                return None
     
     def get_all_contracts(self) -> Dict[str, Dict[str, Any]]:
         """Get all stored contracts"""
@@ -157,71 +257,89 @@ class ContractStorage:
         Returns:
             True if removed, False if not found
         """
-        try:
-            if alerter_name in self.contracts:
-                del self.contracts[alerter_name]
-                self._save_contracts()
-                logger.info(f"Removed stored contract for {alerter_name}")
-                return True
-            else:
-                logger.info(f"No contract to remove for {alerter_name}")
+        with self._lock:
+            try:
+                if self._remove_contract_nosave(alerter_name):
+                    self._rebuild_norm_index()
+                    self._alias_cache.clear()
+                    self._mark_dirty()
+                    logger.info(f"Removed stored contract for {alerter_name}")
+                    return True
+                else:
+                    logger.info(f"No contract to remove for {alerter_name}")
+                    return False
+            except Exception as e:
+                logger.error(f"Error removing contract for {alerter_name}: {e}")
                 return False
-        except Exception as e:
-            logger.error(f"Error removing contract for {alerter_name}: {e}")
+
+    def _remove_contract_nosave(self, alerter_name: str) -> bool:
+        """Remove a contract from memory without refreshing lookups or scheduling a save"""
+        if alerter_name not in self.contracts:
             return False
+        del self.contracts[alerter_name]
+        return True
 
     def migrate_contract_key(self, old_key: str, new_key: str) -> bool:
         """
         Move a stored contract from old_key to new_key. Returns True on success.
         If new_key already exists, this is a no-op and returns False.
         """
-        try:
-            if not old_key or not new_key:
-                return False
-            if old_key not in self.contracts:
-                return False
-            if new_key in self.contracts:
-                # Don't overwrite existing new_key
-                logger.info(f"Not migrating contract: target key {new_key} already exists")
-                return False
-            # Move and update metadata
-            self.contracts[new_key] = self.contracts.pop(old_key)
+        with self._lock:
             try:
-                # Update the stored alerter metadata
-                self.contracts[new_key]['alerter'] = new_key
-                self.contracts[new_key]['migrated_from'] = old_key
-                self.contracts[new_key]['migrated_at'] = datetime.now().isoformat()
-            except Exception:
-                pass
-            self._save_contracts()
-            logger.info(f"Migrated contract from {old_key} to {new_key}")
-            return True
-        except Exception as e:
-            logger.error(f"Error migrating contract from {old_key} to {new_key}: {e}")
-            return False
+                if not old_key or not new_key:
+                    return False
+                if old_key not in self.contracts:
+                    return False
+                if new_key in self.contracts:
+                    # Don't overwrite existing new_key
+                    logger.info(f"Not migrating contract: target key {new_key} already exists")
+                    return False
+                # Move and update metadata
+                self.contracts[new_key] = self.contracts.pop(old_key)
+                try:
+                    # Update the stored alerter metadata
+                    self.contracts[new_key]['alerter'] = new_key
+                    self.contracts[new_key]['migrated_from'] = old_key
+                    self.contracts[new_key]['migrated_at'] = datetime.now().isoformat()
+                except Exception:
+                    pass
+                self._rebuild_norm_index()
+                self._alias_cache.clear()
+                self._mark_dirty()
+                logger.info(f"Migrated contract from {old_key} to {new_key}")
+                return True
+            except Exception as e:
+                logger.error(f"Error migrating contract from {old_key} to {new_key}: {e}")
+                return False
     
-    def is_contract_expired(self, alerter_name: str) -> bool:
+    def is_contract_expired(self, alerter_name: str, contract: Optional[Dict[str, Any]] = None) -> bool:
         """
         Check if a stored contract is expired (for 0DTE options)
         
         Args:
             alerter_name: Name of the alerter
+            contract: The alerter's stored contract, if the caller already fetched it
             
         Returns:
             True if expired, False if still valid
         """
-        try:
+        if contract is None:
             contract = self.get_contract(alerter_name)
+        return self._is_expired(alerter_name, contract, date.today())
+
+    def _is_expired(self, alerter_name: str, contract: Optional[Dict[str, Any]], today: date) -> bool:
+        """Expiry check against a caller-supplied `today`, so cleanup passes read the clock once"""
+        try:
             if not contract:
                 return True
             
             # For 0DTE options, check if it's still the same day
             expiry = contract.get('expiry')
             if expiry:
+                expiry = str(expiry)
                 # If expiry is in YYYYMMDD format
-                if len(str(expiry)) == 8:
-                    contract_date = datetime.strptime(str(expiry), '%Y%m%d').date()
-                    today = date.today()
+                if len(expiry) == 8:
+                    contract_date = date(int(expiry[:4]), int(expiry[4:6]), int(expiry[6:8]))
                     
                     is_expired = contract_date < today
                     if is_expired:
@@ -238,20 +356,26 @@ class ContractStorage:
     
     def cleanup_expired_contracts(self):
         """Remove all expired contracts"""
-        try:
-            expired_alerters = []
-            for alerter_name in list(self.contracts.keys()):
-                if self.is_contract_expired(alerter_name):
-                    expired_alerters.append(alerter_name)
-            
-            for alerter_name in expired_alerters:
-                self.remove_contract(alerter_name)
+        with self._lock:
+            try:
+                today = date.today()
+                expired_alerters = [
+                    alerter_name for alerter_name, contract in self.contracts.items()
+                    if self._is_expired(alerter_name, contract, today)
+                ]
                 
-            if expired_alerters:
-                logger.info(f"Cleaned up {len(expired_alerters)} expired contracts: {expired_alerters}")
-            
-        except Exception as e:
-            logger.error(f"Error cleaning up expired contracts: {e}")
+                for alerter_name in expired_alerters:
+                    self._remove_contract_nosave(alerter_name)
+                    
+                if expired_alerters:
+                    # Refresh lookups and save once for the whole pass
+                    self._rebuild_norm_index()
+                    self._alias_cache.clear()
+                    self._mark_dirty()
+                    logger.info(f"Cleaned up {len(expired_alerters)} expired contracts: {expired_alerters}")
+                
+            except Exception as e:
+                logger.error(f"Error cleaning up expired contracts: {e}")
     
     def get_storage_stats(self) -> Dict[str, Any]:
         """Get storage statistics"""
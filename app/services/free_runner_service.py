@@ -1,16 +1,141 @@
 """
 Free Runner tracking service for monitoring position price targets
 """
-from typing import Dict, Any, Optional
+from dataclasses import dataclass
+import functools
+from typing import Dict, Any, List, Optional, Set
 import asyncio
+import logging
+import time
 from .ibkr_service import ibkr_service
 
+logger = logging.getLogger(__name__)
+
+# Seconds between free runner checks while any runner is active
+FREE_RUNNER_POLL_INTERVAL = 2.0
+# Seconds a fetched positions snapshot is reused; a little longer than the
+# runner poll interval so websocket position polls share the runner's fetch
+POSITIONS_SNAPSHOT_MAX_AGE = 3.0
+
+
+@dataclass(slots=True)
+class FreeRunner:
+    """A tracked free runner order"""
+    target_price: float
+    is_long: bool
+    position_size: float
+    start_price: float
+    start_time: int  # time.monotonic_ns() at creation
+    symbol: Optional[str]
+    status: str = "active"
+
+
+# Trailing-order fields of a target_reached event; short runners place no order
+_SHORT_EVENT_FIELDS = {
+    "trailing_limit_order": None,
+    "trailing_limit_amount": None,
+    "limit_offset": None,
+    "extended_hours_enabled": None,
+    "entry_price": None,
+    "gain_preserved": None,
+}
+
+
+def _long_event_fields(trailing_amount: Optional[float], entry_price: float) -> Dict[str, Any]:
+    """Trailing-order fields of a target_reached event for a long runner"""
+    return {
+        "trailing_limit_order": None,
+        "trailing_limit_amount": trailing_amount,
+        "limit_offset": 0.01,
+        "extended_hours_enabled": True,
+        "entry_price": entry_price,
+        "gain_preserved": "90%" if trailing_amount else None,
+    }
+
 
 class FreeRunnerService:
     """Service for managing free runner tracking orders"""
+
+    __slots__ = (
+        "free_runners", "_active_conids", "_last_prices", "_subscribers", "_task", "_running",
+        "_positions", "_positions_at", "_positions_lock",
+    )
     
     def __init__(self):
-        self.free_runners: Dict[int, Dict[str, Any]] = {}
+        self.free_runners: Dict[int, FreeRunner] = {}
+        # Conids of runners still active, so checks skip completed entries
+        self._active_conids: Set[int] = set()
+        # Last price each active runner was checked at; an unchanged price cannot newly trigger
+        self._last_prices: Dict[int, float] = {}
+        # WebSockets that receive free runner completion events
+        self._subscribers: Set[Any] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        # Latest positions snapshot shared with the websocket positions poll
+        self._positions: Optional[List[Dict[str, Any]]] = None
+        self._positions_at = 0.0
+        self._positions_lock = asyncio.Lock()
+
+    async def get_positions_snapshot(self, max_age: float = POSITIONS_SNAPSHOT_MAX_AGE) -> List[Dict[str, Any]]:
+        """Return formatted positions, fetching from IBKR only if the shared snapshot is older than max_age"""
+        async with self._positions_lock:
+            if self._positions is None or time.monotonic() - self._positions_at > max_age:
+                self._positions = await asyncio.to_thread(ibkr_service.get_formatted_positions) or []
+                self._positions_at = time.monotonic()
+            return self._positions
+
+    async def start(self, poll_interval: float = FREE_RUNNER_POLL_INTERVAL):
+        """Start the background task that checks runners and publishes completions"""
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self.run(poll_interval), name="free_runner_service")
+        logger.info("FreeRunnerService started")
+
+    async def stop(self):
+        """Stop the background check task"""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("FreeRunnerService stopped")
+
+    async def run(self, poll_interval: float = FREE_RUNNER_POLL_INTERVAL):
+        """Check active runners against a fresh positions snapshot every poll_interval seconds"""
+        while self._running:
+            try:
+                if self._active_conids:
+                    positions = await self.get_positions_snapshot(poll_interval)
+                    events = await self.check_runner_conditions(positions)
+                    if events:
+                        await self._publish(events)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("FreeRunnerService: error in run loop")
+            await asyncio.sleep(poll_interval)
+
+    def subscribe(self, websocket):
+        """Send future free runner completion events to this websocket"""
+        self._subscribers.add(websocket)
+
+    def unsubscribe(self, websocket):
+        """Stop sending free runner events to this websocket"""
+        self._subscribers.discard(websocket)
+
+    async def _publish(self, events: List[Dict[str, Any]]):
+        """Send completion events to every subscriber, dropping dead connections"""
+        for websocket in list(self._subscribers):
+            try:
+                for event in events:
+                    await websocket.send_json(event)
+            except Exception:
+                logger.debug("Failed to send free runner event to a websocket, removing it")
+                self._subscribers.discard(websocket)
     
     def create_free_runner(self, conid: int, target_price: float) -> Dict[str, Any]:
         """Create a free runner tracking order"""
@@ -26,16 +151,16 @@ class FreeRunnerService:
         current_price = target_position.get("mktPrice", 0)
         
         # Store the free runner tracking order
-        import time
-        self.free_runners[conid] = {
-            "target_price": target_price,
-            "is_long": is_long,
-            "position_size": position_size,
-            "start_price": current_price,
-            "start_time": time.time(),  # Use time.time() instead of asyncio event loop
-            "symbol": target_position.get("contractDesc"),
-            "status": "active"
-        }
+        self.free_runners[conid] = FreeRunner(
+            target_price=target_price,
+            is_long=is_long,
+            position_size=position_size,
+            start_price=current_price,
+            start_time=time.monotonic_ns(),  # Monotonic, so runner age is immune to wall-clock jumps
+            symbol=target_position.get("contractDesc")
+        )
+        self._active_conids.add(conid)
+        self._last_prices.pop(conid, None)
         
         return {
             "conid": conid,
@@ -46,118 +171,133 @@ class FreeRunnerService:
             "symbol": target_position.get("contractDesc")
         }
     
-    def get_active_runners(self) -> Dict[int, Dict[str, Any]]:
+    def get_active_runners(self) -> Dict[int, FreeRunner]:
         """Get all active free runners"""
-        return {conid: runner for conid, runner in self.free_runners.items() 
-                if runner.get("status") == "active"}
+        return {conid: self.free_runners[conid] for conid in self._active_conids}
     
     def complete_runner(self, conid: int, reason: str):
         """Mark a free runner as completed"""
         if conid in self.free_runners:
-            self.free_runners[conid]["status"] = "completed"
+            self.free_runners[conid].status = "completed"
+            self._active_conids.discard(conid)
+            self._last_prices.pop(conid, None)
     
-    def check_runner_conditions(self, current_positions: list) -> list:
-        """Check if any free runners have met their conditions"""
+    async def check_runner_conditions(self, current_positions: list) -> list:
+        """Check if any free runners have met their conditions
+
+        Trailing limit orders for runners that hit their target in the same
+        tick are placed concurrently once the scan is done.
+        """
         completed_events = []
-        position_conids = {pos.get("conid") for pos in current_positions if pos.get("position", 0) != 0}
+        # (completion event, order kwargs) for each trailing limit order to place
+        pending_orders = []
+        append_event = completed_events.append
+        last_prices = self._last_prices
+        # Open positions by conid, for O(1) existence checks and data lookups
+        positions_by_conid = {pos.get("conid"): pos for pos in current_positions if pos.get("position", 0) != 0}
         
-        for conid, runner_info in self.get_active_runners().items():
-            target_price = runner_info["target_price"]
-            is_long = runner_info.get("is_long", True)
+        # Iterate a snapshot, since completing a runner removes it from the active set
+        for conid in tuple(self._active_conids):
+            runner = self.free_runners[conid]
+            target_price = runner.target_price
+            is_long = runner.is_long
             
             # Check if position still exists
-            if conid not in position_conids:
-                completed_events.append({
+            current_pos = positions_by_conid.get(conid)
+            if current_pos is None:
+                append_event({
                     "type": "free_runner_completed",
                     "data": {
                         "conid": conid,
                         "reason": "position_closed",
                         "target_price": target_price,
-                        "symbol": runner_info.get("symbol"),
+                        "symbol": runner.symbol,
                         "message": f"Position closed before reaching target price {target_price}"
                     }
                 })
                 self.complete_runner(conid, "position_closed")
                 continue
             
-            # Get current position data
-            current_pos = next((pos for pos in current_positions if pos.get("conid") == conid), None)
-            if not current_pos:
+            pos_get = current_pos.get
+            current_price = pos_get("currentPrice", 0)
+            if not current_price or last_prices.get(conid) == current_price:
                 continue
-                
-            current_price = current_pos.get("currentPrice", 0)
-            if not current_price:
+            
+            # Check if target price is reached; everything below runs only for triggered runners
+            if not (current_price >= target_price if is_long else current_price <= target_price):
+                last_prices[conid] = current_price
                 continue
             
-            # Check if target price is reached
-            target_reached = False
-            if is_long and current_price >= target_price:
-                target_reached = True
-            elif not is_long and current_price <= target_price:
-                target_reached = True
+            symbol = runner.symbol
+            # For long positions, place a trailing stop sell order
+            order_spec = None
+            trailing_amount = None
+            entry_price = pos_get("avgPrice", 0)
             
-            if target_reached:
-                # For long positions, place a trailing stop sell order
-                order_result = None
-                trailing_amount = None
+            if is_long:
+                # Fallback: 2% of target price when there is no entry price or no gain
+                fallback = target_price * 0.02
                 
-                if is_long:
-                    try:
-                        # Get the original entry price from the position
-                        entry_price = current_pos.get("avgPrice", 0)
-                        
-                        if entry_price > 0:
-                            # Calculate the gain from entry to target
-                            price_gain = target_price - entry_price
-                            
-                            # Set trailing stop at 10% of the gain below the target price
-                            # This preserves 90% of the gain from the original entry point
-                            trailing_amount = price_gain * 0.10
-                            
-                            # Ensure trailing amount is positive and reasonable
-                            if trailing_amount <= 0:
-                                # Fallback: use 2% of target price if calculation results in negative/zero
-                                trailing_amount = target_price * 0.02
-                        else:
-                            # Fallback: use 2% of target price if we can't get entry price
-                            trailing_amount = target_price * 0.02
-                        
-                        # Place trailing limit order for the current position size
-                        # Use a small limit offset (1 cent) to ensure execution while allowing extended hours
-                        order_result = ibkr_service.place_trailing_limit_order(
-                            conid=conid,
-                            quantity=abs(current_pos.get("position", 0)),
-                            trailing_amount=trailing_amount,
-                            limit_offset=0.01  # 1 cent limit offset for better execution
-                        )
-                        
-                    except Exception as e:
-                        # Log the error but continue with the completion event
-                        print(f"Failed to place trailing limit order for conid {conid}: {str(e)}")
+                # Set trailing stop at 10% of the gain from entry to target below the target price
+                # This preserves 90% of the gain from the original entry point
+                # (avgPrice can be None on a formatted position)
+                trailing_amount = (target_price - entry_price) * 0.10 if entry_price and entry_price > 0 else fallback
+                if trailing_amount <= 0:
+                    trailing_amount = fallback
                 
-                completed_events.append({
-                    "type": "free_runner_completed",
-                    "data": {
-                        "conid": conid,
-                        "reason": "target_reached",
-                        "target_price": target_price,
-                        "current_price": current_price,
-                        "position": current_pos,
-                        "symbol": runner_info.get("symbol"),
-                        "message": f"Target price {target_price} reached! Current price: {current_price}",
-                        "is_long": is_long,
-                        "trailing_limit_order": order_result if is_long else None,
-                        "trailing_limit_amount": trailing_amount if is_long else None,
-                        "limit_offset": 0.01 if is_long else None,
-                        "extended_hours_enabled": True if is_long else None,
-                        "entry_price": current_pos.get("avgPrice", 0) if is_long else None,
-                        "gain_preserved": f"{90}%" if is_long and trailing_amount else None
-                    }
-                })
-                self.complete_runner(conid, "target_reached")
+                # Trailing limit order for the current position size, placed after the scan;
+                # placement failures are logged where the orders are gathered
+                # Use a small limit offset (1 cent) to ensure execution while allowing extended hours
+                order_spec = {
+                    "conid": conid,
+                    "quantity": abs(pos_get("position", 0)),
+                    "trailing_amount": trailing_amount,
+                    "limit_offset": 0.01  # 1 cent limit offset for better execution
+                }
+            
+            event = {
+                "type": "free_runner_completed",
+                "data": {
+                    "conid": conid,
+                    "reason": "target_reached",
+                    "target_price": target_price,
+                    "current_price": current_price,
+                    "position": current_pos,
+                    "symbol": symbol,
+                    "message": f"Target price {target_price} reached! Current price: {current_price}",
+                    "is_long": is_long,
+                    # trailing_limit_order is filled in once the order is placed
+                    **(_long_event_fields(trailing_amount, entry_price) if is_long else _SHORT_EVENT_FIELDS)
+                }
+            }
+            append_event(event)
+            if order_spec is not None:
+                pending_orders.append((event, order_spec))
+            self.complete_runner(conid, "target_reached")
+        
+        if pending_orders:
+            results = await asyncio.gather(
+                *(asyncio.to_thread(ibkr_service.place_trailing_limit_order, **spec) for _, spec in pending_orders),
+                return_exceptions=True
+            )
+            for (event, spec), result in zip(pending_orders, results):
+                if isinstance(result, Exception):
+                    # Log the error but keep the completion event
+                    logger.error("Failed to place trailing limit order for conid %s", spec["conid"], exc_info=result)
+                    continue
+                event["data"]["trailing_limit_order"] = result
         
         return completed_events
 
 
-# Global instance
-free_runner_service = FreeRunnerService()
+@functools.lru_cache(maxsize=1)
+def get_free_runner_service() -> FreeRunnerService:
+    """Return the shared FreeRunnerService, creating it on first use"""
+    return FreeRunnerService()
+
+
+def __getattr__(name):
+    # The free_runner_service alias is created on first access (PEP 562)
+    if name == "free_runner_service":
+        return get_free_runner_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
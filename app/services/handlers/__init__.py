@@ -1,11 +1,18 @@
 """
 Alerter handlers package
+
+Handler classes are imported on first access (PEP 562), so importing a single
+submodule such as lite_handlers does not load every handler.
 """
-from .real_day_trading_handler import RealDayTradingHandler
-from .nyrleth_handler import NyrlethHandler
-from .demslayer_spx_alerts_handler import DemslayerSpxAlertsHandler
-from .prof_and_kian_alerts_handler import ProfAndKianAlertsHandler
-from .robin_da_hood_handler import RobinDaHoodHandler
+import importlib
+
+_LAZY = {
+    "RealDayTradingHandler": ".real_day_trading_handler",
+    "NyrlethHandler": ".nyrleth_handler",
+    "DemslayerSpxAlertsHandler": ".demslayer_spx_alerts_handler",
+    "ProfAndKianAlertsHandler": ".prof_and_kian_alerts_handler",
+    "RobinDaHoodHandler": ".robin_da_hood_handler",
+}
 
 __all__ = [
     "RealDayTradingHandler",
@@ -14,3 +21,16 @@ __all__ = [
     "ProfAndKianAlertsHandler"
     ,"RobinDaHoodHandler"
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,15 +2,45 @@
 Demslayer SPX Alerts handler
 Specialized handler for 0DTE SPX options alerts from demslayer-spx-alerts
 """
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
 from ..ibkr_service import IBKRService
 from ..contract_storage import contract_storage
 
 logger = logging.getLogger(__name__)
 
+# Pattern for SPX options: 4-digit strike + C/P (e.g. 6480P, 6480C)
+_CONTRACT_RE = re.compile(r'(\d{4})([CP])', re.IGNORECASE)
+
+# Seconds IBKR contract details are reused; contract identity does not change intraday
+CONTRACT_DETAILS_CACHE_TTL = 3600.0
+# Seconds an IBKR bid/ask snapshot is reused for repeated alerts on the same contract
+SPREAD_CACHE_TTL = 2.0
+# Most entries kept in each of the contract details and spread caches
+IBKR_CACHE_MAX_ENTRIES = 256
+# Seconds a fetched IBKR positions snapshot is reused across alerts
+POSITIONS_CACHE_TTL = 1.0
+# Seconds the stored contract is reused before re-reading contract storage
+STORED_CONTRACT_CACHE_TTL = 2.0
+# Symbol roots of SPX index option positions
+_SPX_ROOTS = ("SPX", "SPXW")
+# Fields that identify a stored contract; a save with the same values is skipped
+_CONTRACT_IDENTITY_KEYS = ("strike", "side", "symbol", "expiry")
+# Ticker placeholders when IBKR data is missing or cannot be formatted
+_TICKER_NO_IBKR = "SPX Contract (No IBKR Data)"
+_TICKER_FORMAT_ERROR = "SPX Contract (Format Error)"
+# processed_data IBKR position fields when IBKR did not return contract details
+_NO_IBKR_FIELDS: Dict[str, Any] = {}
+
+# Runs the IBKR contract details -> spread lookup alongside the positions fetch
+_IBKR_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="demslayer-ibkr")
+
 class DemslayerSpxAlertsHandler:
     """Handler for demslayer-spx-alerts notifications"""
     
@@ -18,45 +48,60 @@ class DemslayerSpxAlertsHandler:
         self.alerter_name = "demslayer-spx-alerts"
         # Initialize IBKR service for real contract data
         self.ibkr_service = IBKRService()
+        # (symbol, strike, right, expiry) -> (expires_at, contract details), oldest first
+        self._details_cache: OrderedDict[tuple, tuple] = OrderedDict()
+        # conid or contract key -> (expires_at, spread data), oldest first
+        self._spread_cache: OrderedDict[Any, tuple] = OrderedDict()
+        # Guards the two caches above, which are used from the IBKR executor threads
+        self._cache_lock = threading.Lock()
+        # (expires_at, positions, upper-cased symbol root -> [(upper-cased symbol, position)])
+        self._positions_cache: Optional[tuple] = None
+        # (date, YYYYMMDD string) for the 0DTE expiry of contracts parsed today
+        self._today_cache: tuple = (None, None)
+        # (expires_at, stored contract); cleared whenever this handler saves a contract
+        self._contract_memo: Optional[tuple] = None
         # Load stored contract on startup
         self._load_stored_contract()
     
     def _load_stored_contract(self):
         """Load the stored contract from persistent storage"""
         try:
-            # Clean up expired contracts first
-            contract_storage.cleanup_expired_contracts()
-            
-            # Load the contract for this alerter
+            # Load the contract for this alerter; expired contracts of all alerters
+            # are swept by the app's periodic cleanup task rather than on every load
             stored_contract = contract_storage.get_contract(self.alerter_name)
             
-            if stored_contract and not contract_storage.is_contract_expired(self.alerter_name):
-                print(f"DEBUG: Loaded stored contract for {self.alerter_name}: {stored_contract}")
+            if stored_contract and not contract_storage.is_contract_expired(self.alerter_name, stored_contract):
+                logger.debug("Loaded stored contract for %s: %s", self.alerter_name, stored_contract)
                 logger.info(f"Loaded stored contract for {self.alerter_name}")
                 return stored_contract
             else:
-                print(f"DEBUG: No valid stored contract found for {self.alerter_name}")
+                logger.debug("No valid stored contract found for %s", self.alerter_name)
                 return None
                 
         except Exception as e:
             logger.error(f"Error loading stored contract: {e}")
-            print(f"DEBUG: Error loading stored contract: {e}")
             return None
     
-    def _save_contract(self, contract_info: Dict[str, Any]):
-        """Save contract to persistent storage"""
+    def _save_contract(self, contract_info: Dict[str, Any], stored_contract: Optional[Dict[str, Any]] = None):
+        """Save contract to persistent storage, unless it matches the already-stored contract"""
         try:
+            if stored_contract and all(stored_contract.get(k) == contract_info.get(k) for k in _CONTRACT_IDENTITY_KEYS):
+                logger.debug("Contract unchanged, not re-saving: %s", contract_info)
+                return
             contract_storage.store_contract(self.alerter_name, contract_info)
-            print(f"DEBUG: Saved contract to persistent storage: {contract_info}")
+            self._contract_memo = None
+            logger.debug("Saved contract to persistent storage: %s", contract_info)
         except Exception as e:
             logger.error(f"Error saving contract: {e}")
-            print(f"DEBUG: Error saving contract: {e}")
     
     def get_stored_contract(self) -> Optional[Dict[str, Any]]:
-        """Get the current stored contract"""
-        return contract_storage.get_contract(self.alerter_name)
-        # Load stored contract on startup
-        self._load_stored_contract()
+        """Get the current stored contract, re-read at most every STORED_CONTRACT_CACHE_TTL seconds"""
+        memo = self._contract_memo
+        if memo and time.monotonic() < memo[0]:
+            return memo[1]
+        stored_contract = contract_storage.get_contract(self.alerter_name)
+        self._contract_memo = (time.monotonic() + STORED_CONTRACT_CACHE_TTL, stored_contract)
+        return stored_contract
     
     def process_notification(self, title: str, message: str, subtext: str) -> Dict[str, Any]:
         """
@@ -73,85 +118,69 @@ class DemslayerSpxAlertsHandler:
         """
         try:
             logger.info(f"Processing {self.alerter_name} notification")
-            print(f"DEBUG: Processing demslayer notification")
-            print(f"DEBUG: Title: {title}")
-            print(f"DEBUG: Message: {message}")
-            print(f"DEBUG: Subtext: {subtext}")
+            logger.debug("Processing demslayer notification - title: %s, message: %s, subtext: %s", title, message, subtext)
             
             # Extract contract information from both message AND subtext
             contract_info = self._extract_contract_info(message, subtext)
-            print(f"DEBUG: Extracted contract_info: {contract_info}")
+            logger.debug("Extracted contract_info: %s", contract_info)
             
-            # Get SPX position from IBKR
-            spx_position = self._get_spx_position()
-            print(f"DEBUG: SPX position: {spx_position}")
+            # Read the stored contract once; everything below uses this snapshot
+            stored_contract = self.get_stored_contract()
             
             # Determine contract to use (from message/subtext, stored, or none)
-            contract_to_use = self._determine_contract(contract_info)
-            print(f"DEBUG: Contract to use: {contract_to_use}")
-
-            # Prepare a baseline processed_data early so downstream blocks can update it
-            processed_data = {
-                "alerter": self.alerter_name,
-                "original_title": title,
-                "original_message": message,
-                "original_subtext": subtext,
-                "processed": True,
-                "instrument": "SPX",
-                "option_type": "0DTE",
-                "action": "BUY",  # Always buying for demslayer
-                "contract_info": contract_info,
-                "stored_contract": self.get_stored_contract(),  # Get from persistent storage
-                "contract_to_use": None,
-                "contract_details": None,
-                "spread_info": None,
-                "ticker": None,  # Use IBKR-formatted ticker when available
-                "has_spx_position": spx_position is not None,
-                "spx_position": spx_position,
-                "timestamp": datetime.now().isoformat(),
-                "storage_stats": contract_storage.get_storage_stats()  # Include storage info
-            }
+            contract_to_use = self._determine_contract(contract_info, stored_contract)
+            logger.debug("Contract to use: %s", contract_to_use)
+            
+            # Start the IBKR contract lookup while positions are fetched; the two are independent
+            details_future = _IBKR_EXECUTOR.submit(self._get_details_and_spread, contract_to_use) if contract_to_use else None
+            
+            # Get SPX position from IBKR
+            positions_by_root = self._get_positions()
+            spx_position = self._get_spx_position(positions_by_root, stored_contract)
+            logger.debug("SPX position: %s", spx_position)
 
             # Get real IBKR contract details
             contract_details = None
             spread_info = None
             ticker_info = None
+            ibkr_fields = _NO_IBKR_FIELDS
             
-            if contract_to_use:
-                print(f"DEBUG: Getting IBKR contract details for: {contract_to_use}")
-                contract_details = self._get_contract_details(contract_to_use)
-                print(f"DEBUG: IBKR contract details: {contract_details}")
+            if details_future:
+                contract_details, spread_info = details_future.result()
+                logger.debug("IBKR contract details: %s", contract_details)
                 
                 if contract_details:
-                    spread_info = self._get_contract_spread(contract_details)
-                    print(f"DEBUG: Contract spread info: {spread_info}")
+                    logger.debug("Contract spread info: %s", spread_info)
+                    # Option right from IBKR ("C"/"P"), normalized once for every use below
+                    right = (contract_details.get('right') or '').upper()
+                    is_call = right.startswith('C')
+                    is_put = right.startswith('P')
                     
                     # Create ticker info from IBKR data
                     ticker_info = self._format_ticker_from_ibkr(contract_details, spread_info)
-                    print(f"DEBUG: Formatted ticker from IBKR: {ticker_info}")
+                    logger.debug("Formatted ticker from IBKR: %s", ticker_info)
                     # Save contract to persistent storage now that IBKR recognizes it
                     try:
                         self._save_contract({
                             "strike": contract_details.get('strike'),
-                            "side": 'CALL' if (contract_details.get('right') or '').upper().startswith('C') else 'PUT',
+                            "side": 'CALL' if is_call else 'PUT',
                             "symbol": contract_details.get('symbol', 'SPX'),
                             "expiry": contract_details.get('expiry')
-                        })
-                        print(f"DEBUG: Stored contract after IBKR verification: {contract_details.get('symbol')} {contract_details.get('strike')}{contract_details.get('right')} {contract_details.get('expiry')}")
+                        }, stored_contract)
+                        logger.debug("Stored contract after IBKR verification: %s %s%s %s", contract_details.get('symbol'), contract_details.get('strike'), contract_details.get('right'), contract_details.get('expiry'))
                     except Exception as e:
                         logger.debug(f"Failed to save contract after IBKR verification: {e}")
 
                     # Check for an open position for this contract and populate IBKR position fields
                     try:
                         pos = None
-                        # Look through formatted positions for a matching symbol
-                        for p in (self.ibkr_service.get_formatted_positions() or []):
-                            sym = (p.get('symbol') or '').upper()
-                            if ticker_info and ticker_info.split()[0].upper() in sym:
+                        # Look up formatted positions sharing the ticker's symbol root
+                        if ticker_info:
+                            for _, p in positions_by_root.get(ticker_info.split()[0].upper(), ()):
                                 pos = p
                                 break
                         if pos:
-                            print(f"DEBUG: Found IBKR position for contract: {pos}")
+                            logger.debug("Found IBKR position for contract: %s", pos)
                             processed_spx_position = {
                                 'symbol': pos.get('symbol'),
                                 'position': pos.get('position'),
@@ -175,10 +204,12 @@ class DemslayerSpxAlertsHandler:
                     ibkr_avg = None
                     ibkr_curr = None
                     if processed_spx_position:
+                        pos_val = processed_spx_position.get('position', 0)
                         try:
-                            ibkr_position_size = abs(int(processed_spx_position.get('position', 0)))
-                        except Exception:
-                            ibkr_position_size = processed_spx_position.get('position')
+                            ibkr_position_size = abs(int(pos_val))
+                        except (TypeError, ValueError, OverflowError):
+                            # None, NaN/inf or non-numeric text: keep the raw value
+                            ibkr_position_size = pos_val
                         ibkr_unrealized = processed_spx_position.get('unrealizedPnl')
                         ibkr_realized = processed_spx_position.get('realizedPnl')
                         ibkr_mv = processed_spx_position.get('marketValue')
@@ -191,10 +222,10 @@ class DemslayerSpxAlertsHandler:
                         if processed_spx_position:
                             option_contracts.append({
                                 'symbol': processed_spx_position.get('symbol'),
-                                'ticker': (ticker_info or contract_details.get('symbol') if contract_details else 'SPX'),
-                                'strike': contract_details.get('strike') if contract_details else processed_spx_position.get('symbol'),
-                                'side': 'CALL' if (contract_details and (contract_details.get('right') or '').upper().startswith('C')) else ('PUT' if (contract_details and (contract_details.get('right') or '').upper().startswith('P')) else processed_spx_position.get('position')),
-                                'quantity': abs(int(processed_spx_position.get('position', 0))) if processed_spx_position.get('position') is not None else 0,
+                                'ticker': ticker_info or contract_details.get('symbol'),
+                                'strike': contract_details.get('strike'),
+                                'side': 'CALL' if is_call else ('PUT' if is_put else processed_spx_position.get('position')),
+                                'quantity': ibkr_position_size if ibkr_position_size is not None else 0,
                                 'unrealizedPnl': processed_spx_position.get('unrealizedPnl'),
                                 'realizedPnl': processed_spx_position.get('realizedPnl'),
                                 'marketValue': processed_spx_position.get('marketValue'),
@@ -205,7 +236,7 @@ class DemslayerSpxAlertsHandler:
                         option_contracts = []
                     
                     # Make these available to processed_data so send_trading_alert renders the same layout
-                    processed_data.update({
+                    ibkr_fields = {
                         'ibkr_position_size': ibkr_position_size,
                         'ibkr_unrealized_pnl': ibkr_unrealized,
                         'ibkr_realized_pnl': ibkr_realized,
@@ -214,18 +245,32 @@ class DemslayerSpxAlertsHandler:
                         'ibkr_current_price': ibkr_curr,
                         'show_close_position_button': bool(ibkr_position_size),
                         'option_contracts': option_contracts
-                    })
+                    }
             
-            # Finalize processed_data with values computed above
-            processed_data["contract_to_use"] = contract_to_use
-            processed_data["contract_details"] = contract_details
-            processed_data["spread_info"] = spread_info
-            processed_data["ticker"] = ticker_info
-
-            print(f"DEBUG: Final processed_data keys: {list(processed_data.keys())}")
-            print(f"DEBUG: Final ticker value: {processed_data.get('ticker')}")
-
-            processed_data["order_result"] = None
+            logger.debug("Final ticker value: %s", ticker_info)
+            
+            # IBKR position fields are only present when IBKR recognized the contract
+            processed_data = {
+                "alerter": self.alerter_name,
+                "original_title": title,
+                "original_message": message,
+                "original_subtext": subtext,
+                "processed": True,
+                "instrument": "SPX",
+                "option_type": "0DTE",
+                "action": "BUY",  # Always buying for demslayer
+                "contract_info": contract_info,
+                "stored_contract": stored_contract,  # From persistent storage
+                "contract_to_use": contract_to_use,
+                "contract_details": contract_details,
+                "spread_info": spread_info,
+                "ticker": ticker_info,  # IBKR-formatted ticker when available
+                "has_spx_position": spx_position is not None,
+                "spx_position": spx_position,
+                "timestamp": datetime.now().isoformat(),
+                **ibkr_fields,
+                "order_result": None
+            }
             return {
                 "success": True,
                 "message": f"Successfully processed {self.alerter_name} notification",
@@ -261,40 +306,42 @@ class DemslayerSpxAlertsHandler:
             search_texts.append(("subtext", subtext))
         
         if not search_texts:
-            print(f"DEBUG: No message or subtext provided")
+            logger.debug("No message or subtext provided")
             return None
-            
-        print(f"DEBUG: Extracting contract from:")
-        for source, text in search_texts:
-            print(f"  {source}: '{text}'")
-        
-        # Pattern for SPX options: 4-digit strike + C/P
-        contract_pattern = r'(\d{4})([CP])'
         
         for source, text in search_texts:
-            matches = re.findall(contract_pattern, text.upper())
-            print(f"DEBUG: Contract pattern matches in {source}: {matches}")
+            # Only the first contract in each text is used
+            match = _CONTRACT_RE.search(text)
+            logger.debug("Contract pattern match in %s: %s", source, match.groups() if match else None)
             
-            if matches:
-                strike, side = matches[0]
+            if match:
+                strike, side = match.groups()
                 contract_info = {
                     "strike": int(strike),
-                    "side": "CALL" if side == "C" else "PUT",
+                    "side": "CALL" if side in "Cc" else "PUT",
                     "symbol": "SPX",
-                    "expiry": date.today().strftime("%Y%m%d"),  # 0DTE = today
+                    "expiry": self._today_str(),  # 0DTE = today
                     "found_in": source
                 }
 
                 # Do not persist here; defer saving until we verify IBKR knows about the contract
-                print(f"DEBUG: Extracted contract from {source} (not yet saved): {contract_info}")
                 logger.info(f"Extracted contract from {source} (not yet saved): {contract_info}")
 
                 return contract_info
         
-        print(f"DEBUG: No contract pattern found in any source")
+        logger.debug("No contract pattern found in any source")
         return None
     
-    def _determine_contract(self, contract_info: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    def _today_str(self) -> str:
+        """Today's date as YYYYMMDD, formatted once per day"""
+        today = date.today()
+        cached_date, cached_str = self._today_cache
+        if cached_date != today:
+            cached_str = today.strftime("%Y%m%d")
+            self._today_cache = (today, cached_str)
+        return cached_str
+    
+    def _determine_contract(self, contract_info: Optional[Dict[str, Any]], stored_contract: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
         Determine which contract to use:
         1. If message has contract info, use it
@@ -303,97 +350,136 @@ class DemslayerSpxAlertsHandler:
         
         Args:
             contract_info: Contract info extracted from current message
+            stored_contract: Contract from persistent storage, if any
             
         Returns:
             Contract to use or None
         """
         if contract_info:
-            print(f"DEBUG: Using contract from message: {contract_info}")
+            logger.debug("Using contract from message: %s", contract_info)
             return contract_info
         else:
-            # Try to get from persistent storage
-            stored_contract = self.get_stored_contract()
-            if stored_contract and not contract_storage.is_contract_expired(self.alerter_name):
-                print(f"DEBUG: Using stored contract: {stored_contract}")
+            # Fall back to the contract from persistent storage
+            if stored_contract and not contract_storage.is_contract_expired(self.alerter_name, stored_contract):
                 logger.info(f"Using stored contract: {stored_contract}")
                 return stored_contract
             else:
-                print(f"DEBUG: No contract specified and no valid stored contract available")
                 logger.info("No contract specified and no stored contract available")
                 return None
     
-    def _get_spx_position(self) -> Optional[Dict[str, Any]]:
+    def _get_positions(self) -> Dict[str, List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Get formatted IBKR positions grouped by upper-cased symbol root,
+        refreshed at most every POSITIONS_CACHE_TTL seconds
+        
+        Returns:
+            Dict of symbol root -> [(upper-cased symbol, position)], empty if IBKR is unavailable
+        """
+        cache = self._positions_cache
+        if cache and time.monotonic() < cache[0]:
+            return cache[2]
+        try:
+            if not self.ibkr_service:
+                logger.debug("No IBKR service available for position check")
+                return {}
+            
+            logger.debug("Getting SPX positions from IBKR...")
+            positions = self.ibkr_service.get_formatted_positions() or []
+            logger.debug("All positions: %s", positions)
+        
+        except Exception as e:
+            logger.error(f"Error getting positions: {e}")
+            return {}
+        
+        # e.g. 'SPX    AUG2025 6054 P [SPXW  250827P00006054000 100]' -> 'SPX'
+        by_root: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        for position in positions:
+            symbol = (position.get("symbol") or "").upper()
+            parts = symbol.split(None, 1)
+            if parts:
+                by_root.setdefault(parts[0], []).append((symbol, position))
+        self._positions_cache = (time.monotonic() + POSITIONS_CACHE_TTL, positions, by_root)
+        return by_root
+    
+    def _get_details_and_spread(self, contract: Dict[str, Any]) -> tuple:
+        """
+        Get IBKR contract details and, once the contract is known, its bid/ask spread
+        
+        Args:
+            contract: Contract info dict
+            
+        Returns:
+            (contract details or None, spread info or None)
+        """
+        logger.debug("Getting IBKR contract details for: %s", contract)
+        contract_details = self._get_contract_details(contract)
+        spread_info = self._get_contract_spread(contract_details) if contract_details else None
+        return contract_details, spread_info
+    
+    def _get_spx_position(self, positions_by_root: Dict[str, List[Tuple[str, Dict[str, Any]]]], stored_contract: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
         Get current SPX options position from IBKR that matches the stored contract
         
+        Args:
+            positions_by_root: Positions grouped by symbol root, from _get_positions
+            stored_contract: Contract from persistent storage to match against
+            
         Returns:
             Position info if found, None otherwise
         """
         try:
-            if not self.ibkr_service:
-                print("DEBUG: No IBKR service available for position check")
-                return None
-                
-            print("DEBUG: Getting SPX positions from IBKR...")
-            positions = self.ibkr_service.get_formatted_positions()
-            print(f"DEBUG: All positions: {positions}")
+            spx_positions = [
+                (symbol, position)
+                for root in _SPX_ROOTS
+                for symbol, position in positions_by_root.get(root, ())
+                if position.get("position", 0) != 0
+            ]
             
-            # Get the stored contract to match against
-            stored_contract = self.get_stored_contract()
             if not stored_contract:
-                print("DEBUG: No stored contract to match positions against")
+                logger.debug("No stored contract to match positions against")
                 # Fall back to any SPX position
-                for position in positions:
-                    symbol = position.get("symbol", "").upper()
-                    if "SPX" in symbol and position.get("position", 0) != 0:
-                        print(f"DEBUG: Found SPX position (no contract match): {position}")
-                        logger.info(f"Found SPX position (no contract match): {position}")
-                        return position
-                print("DEBUG: No SPX positions found")
+                for _, position in spx_positions:
+                    logger.info(f"Found SPX position (no contract match): {position}")
+                    return position
+                logger.debug("No SPX positions found")
                 return None
             
             # Try to find position matching the stored contract
             # Normalize strike to match IBKR symbol text (e.g., '6500' not '6500.0')
             raw_strike = stored_contract.get('strike', '')
-            try:
-                if isinstance(raw_strike, float) and float(raw_strike).is_integer():
-                    target_strike = str(int(raw_strike))
-                else:
-                    target_strike = str(raw_strike)
-            except Exception:
+            if isinstance(raw_strike, float) and raw_strike.is_integer():
+                target_strike = str(int(raw_strike))
+            else:
                 target_strike = str(raw_strike)
             target_side = stored_contract.get('side', '').upper()
             target_expiry = stored_contract.get('expiry', '')
             
-            print(f"DEBUG: Looking for position matching: {target_strike}{target_side[0] if target_side else ''} {target_expiry}")
+            logger.debug("Looking for position matching: %s%s %s", target_strike, target_side[0] if target_side else '', target_expiry)
             
-            # Look for matching SPX options positions
-            for position in positions:
-                symbol = position.get("symbol", "").upper()
-                position_size = position.get("position", 0)
-                
-                if "SPX" in symbol and position_size != 0:
-                    print(f"DEBUG: Checking position: {symbol}")
-                    
-                    # Try to extract strike and expiry from symbol
-                    # Example: "SPX    AUG2025 6054 P [SPXW  250827P00006054000 100]"
-                    if target_strike in symbol:
-                        # Check if it's the right type (C/P)
-                        if target_side.startswith('PUT') and ' P ' in symbol:
-                            print(f"DEBUG: Found matching PUT position: {position}")
-                            logger.info(f"Found matching PUT position: {position}")
-                            return position
-                        elif target_side.startswith('CALL') and ' C ' in symbol:
-                            print(f"DEBUG: Found matching CALL position: {position}")
-                            logger.info(f"Found matching CALL position: {position}")
-                            return position
-            
-            print("DEBUG: No SPX positions found matching stored contract")
-            return None
+            # Right marker in the IBKR symbol for the stored side (C/P)
+            # Example: "SPX    AUG2025 6054 P [SPXW  250827P00006054000 100]"
+            if target_side.startswith('PUT'):
+                side_label, want_right = 'PUT', ' P '
+            elif target_side.startswith('CALL'):
+                side_label, want_right = 'CALL', ' C '
+            else:
+                logger.debug("No SPX positions found matching stored contract")
+                return None
+            
+            # First SPX options position with the stored strike and right
+            position = next(
+                (position for symbol, position in spx_positions if target_strike in symbol and want_right in symbol),
+                None
+            )
+            if position is None:
+                logger.debug("No SPX positions found matching stored contract")
+                return None
+            
+            logger.info(f"Found matching {side_label} position: {position}")
+            return position
             
         except Exception as e:
             logger.error(f"Error getting SPX position: {e}")
-            print(f"DEBUG: Error getting SPX position: {e}")
             return None
     
     def _check_spx_position(self) -> Optional[Dict[str, Any]]:
@@ -404,17 +490,14 @@ class DemslayerSpxAlertsHandler:
             Position info if found, None otherwise
         """
         try:
-            if not self.ibkr_service:
-                return None
-                
-            positions = self.ibkr_service.get_formatted_positions()
+            positions_by_root = self._get_positions()
             
             # Look for SPX options positions
-            for position in positions:
-                symbol = position.get("symbol", "").upper()
-                if "SPX" in symbol and position.get("position", 0) != 0:
-                    logger.info(f"Found SPX position: {position}")
-                    return position
+            for root in _SPX_ROOTS:
+                for _, position in positions_by_root.get(root, ()):
+                    if position.get("position", 0) != 0:
+                        logger.info(f"Found SPX position: {position}")
+                        return position
                     
             return None
             
@@ -434,10 +517,10 @@ class DemslayerSpxAlertsHandler:
         """
         try:
             if not self.ibkr_service:
-                print("DEBUG: No IBKR service for contract details")
+                logger.debug("No IBKR service for contract details")
                 return None
                 
-            print(f"DEBUG: Getting contract details from IBKR for: {contract}")
+            logger.debug("Getting contract details from IBKR for: %s", contract)
             
             # Use IBKR service to search for the contract
             # Format: symbol, strike, side, expiry
@@ -446,26 +529,53 @@ class DemslayerSpxAlertsHandler:
             side = contract.get("side")  # "CALL" or "PUT"
             expiry = contract.get("expiry")
             
-            print(f"DEBUG: Searching IBKR for contract - Symbol: {symbol}, Strike: {strike}, Side: {side}, Expiry: {expiry}")
+            right = side[0] if side else "P"  # "C" or "P"
+            key = (symbol, strike, right, expiry)
+            cached = self._cache_get(self._details_cache, key)
+            if cached is not None:
+                return cached
+            
+            logger.debug("Searching IBKR for contract - Symbol: %s, Strike: %s, Side: %s, Expiry: %s", symbol, strike, side, expiry)
             
             # Get contract details using ibind library through IBKR service
             contract_details = self.ibkr_service.get_option_contract_details(
                 symbol=symbol,
                 strike=strike,
-                right=side[0] if side else "P",  # "C" or "P"
+                right=right,
                 expiry=expiry
             )
+            if contract_details:
+                self._cache_put(self._details_cache, key, contract_details, CONTRACT_DETAILS_CACHE_TTL)
             
-            print(f"DEBUG: IBKR contract details result: {contract_details}")
             logger.info(f"IBKR contract details: {contract_details}")
             
             return contract_details
             
         except Exception as e:
             logger.error(f"Error getting contract details: {e}")
-            print(f"DEBUG: Error getting contract details: {e}")
             return None
     
+    def _cache_get(self, cache: OrderedDict, key: Any) -> Any:
+        """Return the unexpired cached value for key, evicting it if expired"""
+        with self._cache_lock:
+            cached = cache.get(key)
+            if cached is None:
+                return None
+            if time.monotonic() < cached[0]:
+                return cached[1]
+            del cache[key]
+            return None
+    
+    def _cache_put(self, cache: OrderedDict, key: Any, value: Any, ttl: float):
+        """Cache value for ttl seconds, sweeping expired entries and capping the cache size"""
+        now = time.monotonic()
+        with self._cache_lock:
+            cache[key] = (now + ttl, value)
+            cache.move_to_end(key)
+            # Each cache uses a single TTL, so entries expire in insertion order
+            while cache and (next(iter(cache.values()))[0] <= now or len(cache) > IBKR_CACHE_MAX_ENTRIES):
+                cache.popitem(last=False)
+    
     def _get_contract_spread(self, contract: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Get current bid/ask spread for the contract
@@ -478,29 +588,27 @@ class DemslayerSpxAlertsHandler:
         """
         try:
             if not self.ibkr_service:
-                print("DEBUG: No IBKR service for spread data")
+                logger.debug("No IBKR service for spread data")
                 return None
                 
-            print(f"DEBUG: Getting spread data from IBKR for: {contract}")
+            key = contract.get("conid") or (contract.get("symbol"), contract.get("strike"), contract.get("right"), contract.get("expiry"))
+            cached = self._cache_get(self._spread_cache, key)
+            if cached is not None:
+                return cached
             
-            # Get market data for the contract
-            print(f"DEBUG: About to call get_option_market_data with contract: {contract}")
-            print(f"DEBUG: IBKR service object: {self.ibkr_service}")
-            print(f"DEBUG: get_option_market_data method: {getattr(self.ibkr_service, 'get_option_market_data', 'METHOD NOT FOUND')}")
+            logger.debug("Getting spread data from IBKR for: %s", contract)
             
+            # Get market data for the contract
             spread_data = self.ibkr_service.get_option_market_data(contract)
             
-            print(f"DEBUG: get_option_market_data returned: {spread_data}")
-            print(f"DEBUG: Return type: {type(spread_data)}")
-            
-            print(f"DEBUG: IBKR spread data result: {spread_data}")
             logger.info(f"IBKR spread data: {spread_data}")
+            if spread_data:
+                self._cache_put(self._spread_cache, key, spread_data, SPREAD_CACHE_TTL)
             
             return spread_data
             
         except Exception as e:
             logger.error(f"Error getting contract spread: {e}")
-            print(f"DEBUG: Error getting contract spread: {e}")
             return None
     
     def _format_ticker_from_ibkr(self, contract_details: Dict[str, Any], spread_info: Optional[Dict[str, Any]] = None) -> str:
@@ -515,12 +623,10 @@ class DemslayerSpxAlertsHandler:
             Formatted ticker string
         """
         try:
-            print(f"DEBUG: Formatting ticker from IBKR data")
-            print(f"DEBUG: Contract details: {contract_details}")
-            print(f"DEBUG: Spread info: {spread_info}")
+            logger.debug("Formatting ticker from IBKR data - details: %s, spread: %s", contract_details, spread_info)
             
             if not contract_details:
-                return "SPX Contract (No IBKR Data)"
+                return _TICKER_NO_IBKR
             
             # Extract key information from IBKR contract
             symbol = contract_details.get("symbol", "SPX")
@@ -543,10 +649,9 @@ class DemslayerSpxAlertsHandler:
             # Format final ticker
             ticker = f"{symbol} {strike}{right} {expiry}{price_info}"
             
-            print(f"DEBUG: Formatted ticker: {ticker}")
+            logger.debug("Formatted ticker: %s", ticker)
             return ticker
             
         except Exception as e:
             logger.error(f"Error formatting ticker: {e}")
-            print(f"DEBUG: Error formatting ticker: {e}")
-            return "SPX Contract (Format Error)"
+            return _TICKER_FORMAT_ERROR
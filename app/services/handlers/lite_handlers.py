@@ -3,49 +3,230 @@ Lite Handlers for processing notifications with contract ID (CONID) integration
 These handlers differentiate between BUY alerts (new positions) and UPDATE alerts (general updates)
 """
 
+import atexit
+import functools
 import json
 import logging
+import mmap
 import re
 import os
-from typing import Dict, Any, Optional, List
-from datetime import datetime, timedelta
+import threading
+import time
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import date, datetime, timedelta
 from ..ibkr_service import ibkr_service
 from ..telegram_service import telegram_service
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 # Path to alerts storage
 ALERTS_FILE = os.path.join(os.path.dirname(__file__), "../../../data/alerts/alerts.json")
 
+# alerts.json files at least this large are memory-mapped straight into orjson
+ALERTS_MMAP_THRESHOLD = 64 * 1024
+
+# Seconds of alert saves coalesced into a single write of alerts.json
+ALERTS_FLUSH_DELAY = 0.25
+
+# Compact JSON bytes of the current alerts, the file mtime they were read at, and
+# whether they hold unwritten changes; guarded by _ALERTS_LOCK. Keeping bytes
+# rather than the parsed dict gives every load its own copy at parse cost
+_ALERTS_CACHE: Dict[str, Any] = {"mtime": 0, "raw": b"{}", "dirty": False}
+_ALERTS_LOCK = threading.Lock()
+# Serializes flushes so an older snapshot never replaces a newer one on disk
+_ALERTS_SAVE_LOCK = threading.Lock()
+# Wakes the background thread that writes saved alerts out
+_ALERTS_FLUSH_EVENT = threading.Event()
+_alerts_flusher: Optional[threading.Thread] = None
+
+# IBKR portal links: quote page is prefix + conid + _QUOTE_SUFFIX, option chain is prefix + conid + _CHAIN_SUFFIX
+_PORTAL_QUOTE_URL = "https://www.interactivebrokers.ie/portal/?loginType=2&action=ACCT_MGMT_MAIN&clt=0&RL=1&locale=es_ES#/quote/"
+_QUOTE_SUFFIX = "?source=onebar&u=false"
+_CHAIN_SUFFIX = "/option/option.chain?source=onebar&u=false"
+
+# Option side -> (short side, sentiment, buy alert emoji, is_bullish)
+_SIDE_META = {
+    "CALL": ("C", "bullish", "🟢 📈", True),
+    "PUT": ("P", "bearish", "🔴 📉", False),
+}
+
+# Precompiled patterns for the notification detection/parsing paths
+# Strike + side (e.g. "175P", "600C", "123.5C"); the side group keeps the message's case
+_STRIKE_SIDE_RE = re.compile(r'(\d+(?:\.\d+)?)([CP])', re.IGNORECASE)
+# All-caps word right at the end of the text preceding a strike
+_TICKER_BEFORE_STRIKE_RE = re.compile(r'\b([A-Z]{2,5})\s*$')
+_URL_RE = re.compile(r'https?://[^\s]+')
+# STRICT expiry: MM/DD or M/D with a forward slash
+_SLASH_EXPIRY_RE = re.compile(r'\b(\d{1,2})/(\d{1,2})\b')
+_DISCORD_LINK_RE = re.compile(r'https://discord\.com/channels/\d+/\d+/\d+')
+_SEE_IT_HERE_RE = re.compile(r'See it here:\s*<a href=')
+# Real Day Trading: "Long $TICKER" / "Short $TICKER", in any case
+_RDT_LONG_RE = re.compile(r'\bLONG\s+\$([A-Z]{2,5})\b', re.IGNORECASE)
+_RDT_SHORT_RE = re.compile(r'\bSHORT\s+\$([A-Z]{2,5})\b', re.IGNORECASE)
+_RECAP_RE = re.compile(r'RECAP', re.IGNORECASE)
+# Demslayer expiry after the strike: MM/DD (10/03), MM-DD (10-03), MMDD (1002), in priority order.
+# A zero-width lookahead reports every position where any format starts, so one scan
+# finds the first occurrence of each format (at most one format can start at a position)
+_SPX_EXPIRY_RE = re.compile(r'(?=(\d{2}/\d{2})|(\d{2}-\d{2})|(\d{4}))')
+# Prof & Kian detailed format, in any case; captured text is upper-cased by the caller
+_PK_TICKER_RE = re.compile(r'TICKER:\s*([A-Z]{2,5})', re.IGNORECASE)
+_PK_STRIKE_RE = re.compile(r'STRIKE:\s*(\d+(?:\.\d+)?)([CP])', re.IGNORECASE)
+_PK_EXP_RE = re.compile(r'EXP:\s*([^\s\n]+)', re.IGNORECASE)
+_PK_FULL_DATE_RE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+_PK_MONTH_DAY_RE = re.compile(r'(\d{1,2})/(\d{1,2})$')
+_PK_MONTHLY_RE = re.compile(r'(\d{1,2})/(\d{4})EXP?')
+
 def _normalize_strike_for_regex(strike: float) -> str:
     """Convert float strike to appropriate string format for regex matching"""
     return str(int(strike)) if strike == int(strike) else str(strike)
 
 def _load_alerts() -> Dict:
-    """Load alerts from JSON file and perform periodic cleanup"""
+    """
+    Load alerts from JSON file and perform periodic cleanup
+    
+    Returns a private copy (see _get_alerts); changes only take effect once
+    passed to _save_alerts.
+    """
+    # Perform cleanup of stale alerts every time we load (throttled to avoid excessive cleanup)
+    # Only cleanup if it's been a while since last cleanup to avoid performance impact
+    import random
+    if random.random() < 0.1:  # 10% chance to run cleanup on each load (roughly every 10 loads)
+        _cleanup_stale_alerts()
+    
+    return _get_alerts()
+
+def _parse_alerts(raw: bytes) -> Dict:
+    """Parse alerts JSON bytes into a fresh dict"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _read_alerts_file() -> Dict:
+    """Parse alerts.json with orjson when available, memory-mapping large files"""
+    with open(ALERTS_FILE, 'rb') as f:
+        if orjson is None:
+            return json.load(f)
+        if os.fstat(f.fileno()).st_size < ALERTS_MMAP_THRESHOLD:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+def _dump_alerts(alerts: Dict, pretty: bool) -> bytes:
+    """Serialize alerts to JSON bytes, compact unless pretty is set"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(alerts, option=option)
+    if pretty:
+        return json.dumps(alerts, indent=2).encode()
+    return json.dumps(alerts, separators=(',', ':')).encode()
+
+def _get_alerts() -> Dict:
+    """
+    Load alerts without the periodic cleanup of _load_alerts
+    
+    The file is cached and only re-read when its mtime changes, so edits made
+    outside the app are still picked up. Each call parses its own dict from the
+    cached bytes, which callers may modify freely; changes only take effect once
+    passed to _save_alerts.
+    """
     try:
-        # Perform cleanup of stale alerts every time we load (throttled to avoid excessive cleanup)
-        # Only cleanup if it's been a while since last cleanup to avoid performance impact
-        import random
-        if random.random() < 0.1:  # 10% chance to run cleanup on each load (roughly every 10 loads)
-            _cleanup_stale_alerts()
+        with _ALERTS_LOCK:
+            raw = _ALERTS_CACHE["raw"]
+            # Saved changes not yet written out are newer than the file
+            dirty = _ALERTS_CACHE["dirty"]
+            cached_mtime = _ALERTS_CACHE["mtime"]
+        if dirty:
+            return _parse_alerts(raw)
         
-        if os.path.exists(ALERTS_FILE):
-            with open(ALERTS_FILE, 'r') as f:
-                return json.load(f)
-        return {}
+        try:
+            mtime = os.stat(ALERTS_FILE).st_mtime_ns
+        except FileNotFoundError:
+            if cached_mtime:
+                # Removed outside the app
+                return {}
+            # Nothing on disk yet; the cache holds only what this process saved
+            mtime = cached_mtime
+        if mtime != cached_mtime:
+            # Parse outside the lock; writes swap the file in atomically
+            data = _read_alerts_file()
+            raw = _dump_alerts(data, pretty=False)
+            with _ALERTS_LOCK:
+                if not _ALERTS_CACHE["dirty"]:
+                    _ALERTS_CACHE["mtime"] = mtime
+                    _ALERTS_CACHE["raw"] = raw
+            return data
+        return _parse_alerts(raw)
     except Exception as e:
         logger.error(f"Error loading alerts: {e}")
         return {}
 
 def _save_alerts(alerts: Dict) -> None:
-    """Save alerts to JSON file"""
-    try:
-        os.makedirs(os.path.dirname(ALERTS_FILE), exist_ok=True)
-        with open(ALERTS_FILE, 'w') as f:
-            json.dump(alerts, f, indent=2)
-    except Exception as e:
-        logger.error(f"Error saving alerts: {e}")
+    """
+    Save alerts to JSON file
+    
+    The write is deferred to a background thread so a burst of saves within
+    ALERTS_FLUSH_DELAY seconds becomes a single write; loads see the saved
+    alerts immediately. The alerts are serialized here, so the caller keeps
+    ownership of the dict and the flusher writes the same bytes.
+    """
+    global _alerts_flusher
+    raw = _dump_alerts(alerts, pretty=False)
+    with _ALERTS_LOCK:
+        _ALERTS_CACHE["raw"] = raw
+        _ALERTS_CACHE["dirty"] = True
+        if _alerts_flusher is None:
+            _alerts_flusher = threading.Thread(target=_alerts_flush_loop, name="alerts-flush", daemon=True)
+            _alerts_flusher.start()
+            atexit.register(_flush_alerts, pretty=True)
+    _ALERTS_FLUSH_EVENT.set()
+
+def _alerts_flush_loop() -> None:
+    """Write alerts.json once per burst of saves"""
+    while True:
+        _ALERTS_FLUSH_EVENT.wait()
+        time.sleep(ALERTS_FLUSH_DELAY)
+        _ALERTS_FLUSH_EVENT.clear()
+        _flush_alerts()
+
+def _flush_alerts(pretty: bool = False) -> None:
+    """
+    Write saved alerts to disk now
+    
+    Args:
+        pretty: Indent the JSON; background writes use the compact form
+    """
+    with _ALERTS_SAVE_LOCK:
+        # Take the saved bytes, then write without holding up loads and saves
+        with _ALERTS_LOCK:
+            if not _ALERTS_CACHE["dirty"]:
+                return
+            payload = _ALERTS_CACHE["raw"]
+            _ALERTS_CACHE["dirty"] = False
+        try:
+            if pretty:
+                payload = _dump_alerts(_parse_alerts(payload), pretty=True)
+            os.makedirs(os.path.dirname(ALERTS_FILE), exist_ok=True)
+            # Write a temp file and swap it in so a crash never leaves a truncated file
+            tmp_path = ALERTS_FILE + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, ALERTS_FILE)
+            mtime = os.stat(ALERTS_FILE).st_mtime_ns
+        except Exception as e:
+            logger.error(f"Error saving alerts: {e}")
+            with _ALERTS_LOCK:
+                # Keep the changes pending so the next flush retries them
+                _ALERTS_CACHE["dirty"] = True
+            return
+        with _ALERTS_LOCK:
+            # Remember the written mtime so the next load skips the parse
+            _ALERTS_CACHE["mtime"] = mtime
 
 def _clear_all_alerts() -> Dict[str, Any]:
     """
@@ -159,18 +340,18 @@ async def _detect_buy_alert(message: str) -> Optional[Dict[str, Any]]:
     Returns: {ticker, strike, side, stock_conid} or None
     """
     # Find all strike+side patterns (e.g., "175P", "600C", "123.5C")
-    strike_patterns = re.finditer(r'(\d+(?:\.\d+)?)([CP])', message.upper())
+    strike_patterns = _STRIKE_SIDE_RE.finditer(message)
     
     for match in strike_patterns:
         strike = float(match.group(1))
-        side = match.group(2)
+        side = match.group(2).upper()
         
         # Look for stock symbol IMMEDIATELY before the strike (within the same word or separated by whitespace)
         before_strike = message[:match.start()].strip()
         
         # Find the last word before the strike - must be all caps and at least 2 characters
         # Look for pattern: [WORD][WHITESPACE][STRIKE] or [WORD][STRIKE] (no space)
-        immediate_before_match = re.search(r'\b([A-Z]{2,5})\s*$', before_strike)
+        immediate_before_match = _TICKER_BEFORE_STRIKE_RE.search(before_strike)
         
         if immediate_before_match:
             potential_ticker = immediate_before_match.group(1)
@@ -197,13 +378,21 @@ async def _detect_buy_alert(message: str) -> Optional[Dict[str, Any]]:
 
 def _format_expiry_for_display(expiry: str) -> str:
     """Format expiry for readable display in Telegram messages with month names (Jan, Feb, etc.)"""
+    try:
+        return _format_expiry_cached(expiry, datetime.now().year)
+    except TypeError:
+        # Unhashable expiry values cannot be cached (or parsed)
+        return expiry
+
+@functools.lru_cache(maxsize=512)
+def _format_expiry_cached(expiry: str, current_year: int) -> str:
+    """Format expiry for display; current_year fills in dates given without a year"""
     try:
         # If expiry is in MMDD format (like "0929", "1030", "1003")
         if len(expiry) == 4 and expiry.isdigit():
             month = int(expiry[:2])
             day = int(expiry[2:])
             # Create date object for current year
-            current_year = datetime.now().year
             exp_date = datetime(current_year, month, day)
             return exp_date.strftime("%b %d")  # "Oct 03", "Oct 30"
         
@@ -221,7 +410,7 @@ def _format_expiry_for_display(expiry: str) -> str:
                     if year < 100:
                         year = 2000 + year if year < 50 else 1900 + year
                 else:
-                    year = datetime.now().year
+                    year = current_year
                 
                 exp_date = datetime(year, month, day)
                 return exp_date.strftime("%b %d")  # "Oct 03", "Dec 20"
@@ -253,19 +442,42 @@ def _format_expiry_for_display(expiry: str) -> str:
         # If any parsing fails, return the original expiry
         return expiry
 
+@functools.lru_cache(maxsize=4)
+def _nearest_friday_expiry(today_ordinal: int) -> Tuple[str, str]:
+    """
+    Nearest Friday expiry after the given day, as (MMDD, YYYYMMDD)
+    
+    Keyed on the date ordinal, so a new day is a new cache entry.
+    """
+    today = date.fromordinal(today_ordinal)
+    days_to_friday = (4 - today.weekday()) % 7  # Friday is weekday 4
+    if days_to_friday == 0:  # If today is Friday, use next Friday
+        days_to_friday = 7
+    
+    expiry_date = today + timedelta(days=days_to_friday)
+    # MMDD for display, YYYYMMDD for the IBKR API
+    return expiry_date.strftime("%m%d"), expiry_date.strftime("%Y%m%d")
+
+@functools.lru_cache(maxsize=4)
+def _next_trading_day_mmdd(today_ordinal: int) -> str:
+    """The given day as MMDD, or the following Monday if it falls on a weekend"""
+    today = date.fromordinal(today_ordinal)
+    if today.weekday() >= 5:  # Saturday (5) or Sunday (6)
+        # Find next Monday
+        today += timedelta(days=7 - today.weekday())
+    return today.strftime("%m%d")
+
 def _extract_expiry(message: str, strike_position: int, ticker: str = None) -> str:
     """Extract expiry from message (must come after strike position) - STRICT date format only"""
     # Look for expiry patterns after the strike position
     message_after_strike = message[strike_position:]
     
     # Remove URLs to avoid false matches from Discord IDs, etc.
-    cleaned_message = re.sub(r'https?://[^\s]+', '', message_after_strike)
+    cleaned_message = _URL_RE.sub('', message_after_strike)
     
     # STRICT: Only accept MM/DD or M/D format with forward slash
     # NO other formats like 0314, OCT25, etc. - these are NOT dates
-    expiry_pattern = r'\b(\d{1,2})/(\d{1,2})\b'
-    
-    match = re.search(expiry_pattern, cleaned_message)
+    match = _SLASH_EXPIRY_RE.search(cleaned_message)
     if match:
         try:
             month, day = int(match.group(1)), int(match.group(2))
@@ -277,8 +489,7 @@ def _extract_expiry(message: str, strike_position: int, ticker: str = None) -> s
                 current_day = datetime.now().day
                 
                 # Check if this might be a historical date (in a recap/summary)
-                message_upper = message.upper()
-                is_historical = 'RECAP' in message_upper
+                is_historical = _RECAP_RE.search(message) is not None
                 
                 if is_historical:
                     # For historical messages, default to current year
@@ -314,36 +525,54 @@ def _extract_expiry(message: str, strike_position: int, ticker: str = None) -> s
         logger.debug(f"No expiry found for {ticker or 'unknown'}, defaulting to next Friday: {default_expiry}")
         return default_expiry
 
+def _find_spx_expiry(text: str) -> Optional[str]:
+    """
+    Find the Demslayer expiry in text as MMDD, trying MM/DD, then MM-DD, then MMDD.
+    Only the first occurrence of each format is considered; an invalid MMDD date falls
+    through to the next format.
+    """
+    first_by_format = [None, None, None]
+    for match in _SPX_EXPIRY_RE.finditer(text):
+        index = match.lastindex - 1
+        if first_by_format[index] is None:
+            first_by_format[index] = match.group(index + 1)
+    
+    for raw_expiry in first_by_format:
+        if raw_expiry is None:
+            continue
+        # Normalize to MMDD format
+        expiry = raw_expiry.replace('/', '').replace('-', '')
+        # Only accept valid months (01-12) and days (01-31)
+        if 1 <= int(expiry[:2]) <= 12 and 1 <= int(expiry[2:]) <= 31:
+            return expiry
+    return None
+
 def _compact_discord_links(message: str) -> str:
     """
     Replace long Discord links with compact versions
     Converts: https://discord.com/channels/123/456/789
     To: <a href='https://discord.com/channels/123/456/789'>🔗 Discord</a>
     """
-    # Pattern to match Discord links
-    discord_pattern = r'https://discord\.com/channels/\d+/\d+/\d+'
-    
     def replace_link(match):
         url = match.group(0)
         return f"<a href='{url}'>🔗 Discord</a>"
     
     # Replace Discord links with compact versions
-    compacted = re.sub(discord_pattern, replace_link, message)
+    compacted = _DISCORD_LINK_RE.sub(replace_link, message)
     
     # Also handle "See it here:" prefix that often appears before Discord links
-    compacted = re.sub(r'See it here:\s*<a href=', '<a href=', compacted)
+    compacted = _SEE_IT_HERE_RE.sub('<a href=', compacted)
     
     return compacted
 
 def _is_recap_message(message: str) -> bool:
     """Check if message contains recap keyword - used by all alerters"""
-    return 'RECAP' in message.upper()
+    return _RECAP_RE.search(message) is not None
 
 def _count_strikes_in_message(message: str) -> int:
     """Count the number of option strikes in the message - used by all alerters"""
     # Find all strike+side patterns (e.g., "175P", "600C", "123.5C")
-    strike_patterns = re.findall(r'\d+(?:\.\d+)?[CP]', message.upper())
-    return len(strike_patterns)
+    return sum(1 for _ in _STRIKE_SIDE_RE.finditer(message))
 
 class LiteRealDayTradingHandler:
     """Lite handler for Real Day Trading notifications"""
@@ -387,27 +616,26 @@ class LiteRealDayTradingHandler:
         - Get closest ITM option with nearest expiry
         """
         try:
-            message_upper = message.upper()
+            # Both patterns need a "$TICKER"; most UPDATE messages have no "$" and skip the regex scans
+            if '$' not in message:
+                return None
             
             # Look for "Long $TICKER" or "Short $TICKER" patterns anywhere in the message
             # The stock ticker must come IMMEDIATELY after Long/Short and be at least 2 characters
-            long_pattern = r'\bLONG\s+\$([A-Z]{2,5})\b'
-            short_pattern = r'\bSHORT\s+\$([A-Z]{2,5})\b'
-            
             side = None
             ticker = None
             
             # Check for Long pattern first
-            long_match = re.search(long_pattern, message_upper)
+            long_match = _RDT_LONG_RE.search(message)
             if long_match:
                 side = "CALL"
-                ticker = long_match.group(1)
+                ticker = long_match.group(1).upper()
             else:
                 # Check for Short pattern
-                short_match = re.search(short_pattern, message_upper)
+                short_match = _RDT_SHORT_RE.search(message)
                 if short_match:
                     side = "PUT"
-                    ticker = short_match.group(1)
+                    ticker = short_match.group(1).upper()
             
             # If no valid Long/Short + $TICKER pattern found, return None
             if not side or not ticker or len(ticker) < 2:
@@ -434,14 +662,7 @@ class LiteRealDayTradingHandler:
                 logger.debug(f"Current price for {ticker}: ${current_price}")
                 
                 # Use nearest Friday expiry (simplified - assume weekly options)
-                today = datetime.now()
-                days_to_friday = (4 - today.weekday()) % 7  # Friday is weekday 4
-                if days_to_friday == 0:  # If today is Friday, use next Friday
-                    days_to_friday = 7
-                
-                expiry_date = today + timedelta(days=days_to_friday)
-                expiry_mmdd = expiry_date.strftime("%m%d")  # Format as MMDD for display
-                expiry_yyyymmdd = expiry_date.strftime("%Y%m%d")  # Format as YYYYMMDD for IBKR API
+                expiry_mmdd, expiry_yyyymmdd = _nearest_friday_expiry(datetime.now().toordinal())
                 
                 # Get closest ITM strike from actual available strikes
                 # Pass stock_conid to avoid redundant lookups
@@ -555,7 +776,7 @@ class LiteRealDayTradingHandler:
                 expiry = buy_info["expiry"]
             else:
                 # Extract expiry (default to today if not found) - for backward compatibility
-                strike_match = re.search(rf'{_normalize_strike_for_regex(strike)}[CP]', message.upper())
+                strike_match = re.search(rf'{_normalize_strike_for_regex(strike)}[CP]', message, re.IGNORECASE)
                 strike_pos = strike_match.end() if strike_match else len(message)
                 expiry = _extract_expiry(message, strike_pos, ticker)
             
@@ -571,8 +792,9 @@ class LiteRealDayTradingHandler:
             except Exception as e:
                 logger.warning(f"Could not get option CONID: {e}")
             
-            # Store the alert
-            self._store_alert(ticker, strike, side, expiry, stock_conid, option_conid)
+            # Store the alert; the stored created_at and the result's processed_at share one clock read
+            processed_at = datetime.now().isoformat()
+            self._store_alert(ticker, strike, side, expiry, stock_conid, option_conid, processed_at)
             
             # Send Telegram message
             telegram_result = await self._send_buy_telegram(
@@ -589,7 +811,7 @@ class LiteRealDayTradingHandler:
                 "stock_conid": stock_conid,
                 "option_conid": option_conid,
                 "telegram_sent": telegram_result,
-                "processed_at": datetime.now().isoformat()
+                "processed_at": processed_at
             }
             
         except Exception as e:
@@ -615,27 +837,28 @@ class LiteRealDayTradingHandler:
             return {"error": str(e)}
     
     def _store_alert(self, ticker: str, strike: float, side: str, expiry: str, 
-                     stock_conid: int, option_conid: Optional[int]) -> None:
+                     stock_conid: int, option_conid: Optional[int], created_at: str) -> None:
         """Store alert in alerts.json"""
         try:
-            alerts = _load_alerts()
+            side_short, sentiment, _, is_bullish = _SIDE_META[side]
+            alerts = _get_alerts()
             
             if self.alerter_name not in alerts:
                 alerts[self.alerter_name] = {}
             
             alerts[self.alerter_name][ticker] = {
                 "open": False,  # Always start as closed - only order tracking sets this to True
-                "created_at": datetime.now().isoformat(),
+                "created_at": created_at,
                 "option_conids": [option_conid] if option_conid else [],
                 "option_conid": option_conid,
-                "sentiment": "bullish" if side == "CALL" else "bearish",
+                "sentiment": sentiment,
                 "conid": stock_conid,
                 "alert_details": {
                     "ticker": ticker,
                     "strike": str(int(strike)) if strike.is_integer() else str(strike),
-                    "side": "C" if side == "CALL" else "P",
+                    "side": side_short,
                     "expiry": expiry,
-                    "is_bullish": side == "CALL"
+                    "is_bullish": is_bullish
                 }
             }
             
@@ -650,21 +873,23 @@ class LiteRealDayTradingHandler:
         """Send BUY alert Telegram message"""
         try:
             # Format the message
-            side_short = "C" if side == "CALL" else "P"
-            emoji = "🔴 📉" if side == "PUT" else "🟢 📈"
+            side_short, _, emoji, _ = _SIDE_META[side]
             
-            telegram_message = f"🚨 {self.alerter_name.upper()}\n{_compact_discord_links(message)}\n\n"
             formatted_expiry = _format_expiry_for_display(expiry)
-            telegram_message += f"{emoji} {ticker} - {int(strike) if strike.is_integer() else strike}{side_short} - {formatted_expiry}"
+            parts = [
+                f"🚨 {self.alerter_name.upper()}\n{_compact_discord_links(message)}\n\n",
+                f"{emoji} {ticker} - {int(strike) if strike.is_integer() else strike}{side_short} - {formatted_expiry}"
+            ]
             
             # Add links if CONIDs available
             if stock_conid:
-                chain_link = f"https://www.interactivebrokers.ie/portal/?loginType=2&action=ACCT_MGMT_MAIN&clt=0&RL=1&locale=es_ES#/quote/{stock_conid}/option/option.chain?source=onebar&u=false"
-                telegram_message += f"  <a href='{chain_link}'>Option Chain</a>"
+                chain_link = _PORTAL_QUOTE_URL + str(stock_conid) + _CHAIN_SUFFIX
+                parts.append(f"  <a href='{chain_link}'>Option Chain</a>")
             
             if option_conid:
-                quote_link = f"https://www.interactivebrokers.ie/portal/?loginType=2&action=ACCT_MGMT_MAIN&clt=0&RL=1&locale=es_ES#/quote/{option_conid}?source=onebar&u=false"
-                telegram_message += f" | <a href='{quote_link}'>🔗 Option Quote</a>"
+                quote_link = _PORTAL_QUOTE_URL + str(option_conid) + _QUOTE_SUFFIX
+                parts.append(f" | <a href='{quote_link}'>🔗 Option Quote</a>")
+            telegram_message = "".join(parts)
             
             # Send via telegram service
             result = await telegram_service.send_buy_alert(telegram_message)
@@ -678,7 +903,7 @@ class LiteRealDayTradingHandler:
     async def _send_update_telegram(self, message: str) -> Dict[str, Any]:
         """Send UPDATE alert Telegram message with all stored alerts"""
         try:
-            alerts = _load_alerts()
+            alerts = _get_alerts()
             alerter_alerts = alerts.get(self.alerter_name, {})
             
             # Check if there are any open alerts with option quote links
@@ -694,17 +919,19 @@ class LiteRealDayTradingHandler:
                 telegram_message = f"{self.alerter_name.upper()}\n{_compact_discord_links(message)}\n\n"
             
             # Add all stored alerts with option quote links
+            lines = [telegram_message]
             for ticker, alert_data in alerter_alerts.items():
                 if alert_data.get("option_conid"):  # Show any alert with valid option_conid
                     details = alert_data["alert_details"]
                     
                     option_conid = alert_data["option_conid"]
-                    quote_link = f"https://www.interactivebrokers.ie/portal/?loginType=2&action=ACCT_MGMT_MAIN&clt=0&RL=1&locale=es_ES#/quote/{option_conid}?source=onebar&u=false"
+                    quote_link = _PORTAL_QUOTE_URL + str(option_conid) + _QUOTE_SUFFIX
 
                     # Format expiry date for readability
                     formatted_expiry = _format_expiry_for_display(details['expiry'])
                     
-                    telegram_message += f"{ticker} - {details['strike']}{details['side']} - {formatted_expiry}  <a href='{quote_link}'>🔗 Option Quote</a>\n"
+                    lines.append(f"{ticker} - {details['strike']}{details['side']} - {formatted_expiry}  <a href='{quote_link}'>🔗 Option Quote</a>\n")
+            telegram_message = "".join(lines)
 
             # Send via telegram service
             result = await telegram_service.send_update_message(telegram_message)
@@ -766,11 +993,11 @@ class LiteDemslayerHandler:
         """
         # Look for any strike+side patterns (e.g., "5950C", "6000P", "123.5C")
         # Since Demslayer only does SPX, any strike+side pattern is a BUY alert
-        strike_match = re.search(r'(\d+(?:\.\d+)?)([CP])', message.upper())
+        strike_match = _STRIKE_SIDE_RE.search(message)
         
         if strike_match:
             strike = float(strike_match.group(1))
-            side = "CALL" if strike_match.group(2) == "C" else "PUT"
+            side = "CALL" if strike_match.group(2) in "Cc" else "PUT"
             
             # Get SPX CONID (no need to verify since Demslayer only does SPX)
             try:
@@ -781,56 +1008,16 @@ class LiteDemslayerHandler:
                     message_after_strike = message[strike_match.end():]  # Everything after "6000C"
                     
                     # Remove URLs to avoid false matches from Discord IDs, etc.
-                    cleaned_message = re.sub(r'https?://[^\s]+', '', message_after_strike)
+                    cleaned_message = _URL_RE.sub('', message_after_strike)
                     
                     # Look for valid expiry patterns in the cleaned message
                     # Valid formats: MMDD (like 1002, 1003, 1025), MM/DD, MM-DD
-                    expiry_patterns = [
-                        r'(\d{2}/\d{2})',           # MM/DD format (10/03)
-                        r'(\d{2}-\d{2})',           # MM-DD format (10-03)
-                        r'(\d{4})',                 # MMDD format (1002, 0930, 1225, etc.)
-                    ]
-                    
-                    expiry = None
-                    for pattern in expiry_patterns:
-                        expiry_match = re.search(pattern, cleaned_message)
-                        if expiry_match:
-                            raw_expiry = expiry_match.group(1)
-                            # Normalize to MMDD format
-                            if '/' in raw_expiry:
-                                expiry = raw_expiry.replace('/', '')
-                            elif '-' in raw_expiry:
-                                expiry = raw_expiry.replace('-', '')
-                            else:
-                                expiry = raw_expiry
-                            
-                            # Validate MMDD format (if 4 digits, ensure it's a valid date)
-                            if len(expiry) == 4 and expiry.isdigit():
-                                month = int(expiry[:2])
-                                day = int(expiry[2:])
-                                # Only accept valid months (01-12) and days (01-31)
-                                if 1 <= month <= 12 and 1 <= day <= 31:
-                                    break
-                                else:
-                                    expiry = None  # Invalid date, continue searching
-                            else:
-                                break  # Non-MMDD format, assume it's valid
+                    expiry = _find_spx_expiry(cleaned_message)
                     
                     # If no valid expiry found, default to 0DTE (current day)
                     if not expiry:
                         # For testing: if weekend, use Monday's date
-                        today = datetime.now()
-                        if today.weekday() >= 5:  # Saturday (5) or Sunday (6)
-                            # Find next Monday
-                            if today.weekday() == 5:  # Saturday
-                                days_until_monday = 2
-                            else:  # Sunday (weekday == 6)
-                                days_until_monday = 1
-                            trading_date = today + timedelta(days=days_until_monday)
-                        else:
-                            trading_date = today
-                        
-                        expiry = trading_date.strftime("%m%d")
+                        expiry = _next_trading_day_mmdd(datetime.now().toordinal())
                         logger.info(f"No valid expiry found in message, defaulting to 0DTE: {expiry}")
                     else:
                         logger.info(f"Found valid expiry: {expiry}")
@@ -871,8 +1058,9 @@ class LiteDemslayerHandler:
             except Exception as e:
                 logger.warning(f"Could not get option CONID: {e}")
             
-            # Store the alert
-            self._store_alert(ticker, strike, side, expiry, stock_conid, option_conid)
+            # Store the alert; the stored created_at and the result's processed_at share one clock read
+            processed_at = datetime.now().isoformat()
+            self._store_alert(ticker, strike, side, expiry, stock_conid, option_conid, processed_at)
             
             # Send Telegram message
             telegram_result = await self._send_buy_telegram(
@@ -889,7 +1077,7 @@ class LiteDemslayerHandler:
                 "stock_conid": stock_conid,
                 "option_conid": option_conid,
                 "telegram_sent": telegram_result,
-                "processed_at": datetime.now().isoformat()
+                "processed_at": processed_at
             }
             
         except Exception as e:
@@ -915,27 +1103,28 @@ class LiteDemslayerHandler:
             return {"error": str(e)}
     
     def _store_alert(self, ticker: str, strike: float, side: str, expiry: str, 
-                     stock_conid: int, option_conid: Optional[int]) -> None:
+                     stock_conid: int, option_conid: Optional[int], created_at: str) -> None:
         """Store alert in alerts.json"""
         try:
-            alerts = _load_alerts()
+            side_short, sentiment, _, is_bullish = _SIDE_META[side]
+            alerts = _get_alerts()
             
             if self.alerter_name not in alerts:
                 alerts[self.alerter_name] = {}
             
             alerts[self.alerter_name][ticker] = {
                 "open": False,  # Always start as closed - only order tracking sets this to True
-                "created_at": datetime.now().isoformat(),
+                "created_at": created_at,
                 "option_conids": [option_conid] if option_conid else [],
                 "option_conid": option_conid,
-                "sentiment": "bullish" if side == "CALL" else "bearish",
+                "sentiment": sentiment,
                 "conid": stock_conid,
                 "alert_details": {
                     "ticker": ticker,
                     "strike": str(int(strike)) if strike.is_integer() else str(strike),
-                    "side": "C" if side == "CALL" else "P",
+                    "side": side_short,
                     "expiry": expiry,
-                    "is_bullish": side == "CALL"
+                    "is_bullish": is_bullish
                 }
             }
             
@@ -950,21 +1139,23 @@ class LiteDemslayerHandler:
         """Send BUY alert Telegram message"""
         try:
             # Format the message
-            side_short = "C" if side == "CALL" else "P"
-            emoji = "🔴 📉" if side == "PUT" else "🟢 📈"
+            side_short, _, emoji, _ = _SIDE_META[side]
             
-            telegram_message = f"🚨 {self.alerter_name.upper()}\n{_compact_discord_links(message)}\n\n"
             formatted_expiry = _format_expiry_for_display(expiry)
-            telegram_message += f"{emoji} {ticker} - {int(strike) if strike.is_integer() else strike}{side_short} - {formatted_expiry}"
+            parts = [
+                f"🚨 {self.alerter_name.upper()}\n{_compact_discord_links(message)}\n\n",
+                f"{emoji} {ticker} - {int(strike) if strike.is_integer() else strike}{side_short} - {formatted_expiry}"
+            ]
             
             # Add links if CONIDs available
             if stock_conid:
-                chain_link = f"https://www.interactivebrokers.ie/portal/?loginType=2&action=ACCT_MGMT_MAIN&clt=0&RL=1&locale=es_ES#/quote/{stock_conid}/option/option.chain?source=onebar&u=false"
-                telegram_message += f"  <a href='{chain_link}'>Option Chain</a>"
+                chain_link = _PORTAL_QUOTE_URL + str(stock_conid) + _CHAIN_SUFFIX
+                parts.append(f"  <a href='{chain_link}'>Option Chain</a>")
             
             if option_conid:
-                quote_link = f"https://www.interactivebrokers.ie/portal/?loginType=2&action=ACCT_MGMT_MAIN&clt=0&RL=1&locale=es_ES#/quote/{option_conid}?source=onebar&u=false"
-                telegram_message += f" | <a href='{quote_link}'>🔗 Option Quote</a>"
+                quote_link = _PORTAL_QUOTE_URL + str(option_conid) + _QUOTE_SUFFIX
+                parts.append(f" | <a href='{quote_link}'>🔗 Option Quote</a>")
+            telegram_message = "".join(parts)
             
             # Send via telegram service
             result = await telegram_service.send_buy_alert(telegram_message)
@@ -978,7 +1169,7 @@ class LiteDemslayerHandler:
     async def _send_update_telegram(self, message: str) -> Dict[str, Any]:
         """Send UPDATE alert Telegram message with all stored alerts"""
         try:
-            alerts = _load_alerts()
+            alerts = _get_alerts()
             alerter_alerts = alerts.get(self.alerter_name, {})
             
             # Check if there are any open alerts with option quote links
@@ -994,17 +1185,19 @@ class LiteDemslayerHandler:
                 telegram_message = f"{self.alerter_name.upper()}\n{_compact_discord_links(message)}\n\n"
             
             # Add all stored alerts with option quote links
+            lines = [telegram_message]
             for ticker, alert_data in alerter_alerts.items():
                 if alert_data.get("option_conid"):  # Show any alert with valid option_conid
                     details = alert_data["alert_details"]
                     
                     option_conid = alert_data["option_conid"]
-                    quote_link = f"https://www.interactivebrokers.ie/portal/?loginType=2&action=ACCT_MGMT_MAIN&clt=0&RL=1&locale=es_ES#/quote/{option_conid}?source=onebar&u=false"
+                    quote_link = _PORTAL_QUOTE_URL + str(option_conid) + _QUOTE_SUFFIX
 
                     # Format expiry date for readability
                     formatted_expiry = _format_expiry_for_display(details['expiry'])
                     
-                    telegram_message += f"{ticker} - {details['strike']}{details['side']} - {formatted_expiry}  <a href='{quote_link}'>🔗 Option Quote</a>\n"
+                    lines.append(f"{ticker} - {details['strike']}{details['side']} - {formatted_expiry}  <a href='{quote_link}'>🔗 Option Quote</a>\n")
+            telegram_message = "".join(lines)
 
             # Send via telegram service
             result = await telegram_service.send_update_message(telegram_message)
@@ -1072,7 +1265,7 @@ class LiteProfAndKianHandler:
                 expiry = self._extract_detailed_expiry(message, ticker)
             else:
                 # Use compact format expiry extraction (original logic)
-                strike_match = re.search(rf'{_normalize_strike_for_regex(strike)}[CP]', message.upper())
+                strike_match = re.search(rf'{_normalize_strike_for_regex(strike)}[CP]', message, re.IGNORECASE)
                 strike_pos = strike_match.end() if strike_match else len(message)
                 expiry = _extract_expiry(message, strike_pos, ticker)
             
@@ -1088,8 +1281,9 @@ class LiteProfAndKianHandler:
             except Exception as e:
                 logger.warning(f"Could not get option CONID: {e}")
             
-            # Store the alert
-            self._store_alert(ticker, strike, side, expiry, stock_conid, option_conid)
+            # Store the alert; the stored created_at and the result's processed_at share one clock read
+            processed_at = datetime.now().isoformat()
+            self._store_alert(ticker, strike, side, expiry, stock_conid, option_conid, processed_at)
             
             # Send Telegram message
             telegram_result = await self._send_buy_telegram(
@@ -1106,7 +1300,7 @@ class LiteProfAndKianHandler:
                 "stock_conid": stock_conid,
                 "option_conid": option_conid,
                 "telegram_sent": telegram_result,
-                "processed_at": datetime.now().isoformat()
+                "processed_at": processed_at
             }
             
         except Exception as e:
@@ -1132,27 +1326,28 @@ class LiteProfAndKianHandler:
             return {"error": str(e)}
     
     def _store_alert(self, ticker: str, strike: float, side: str, expiry: str, 
-                     stock_conid: int, option_conid: Optional[int]) -> None:
+                     stock_conid: int, option_conid: Optional[int], created_at: str) -> None:
         """Store alert in alerts.json"""
         try:
-            alerts = _load_alerts()
+            side_short, sentiment, _, is_bullish = _SIDE_META[side]
+            alerts = _get_alerts()
             
             if self.alerter_name not in alerts:
                 alerts[self.alerter_name] = {}
             
             alerts[self.alerter_name][ticker] = {
                 "open": False,  # Always start as closed - only order tracking sets this to True
-                "created_at": datetime.now().isoformat(),
+                "created_at": created_at,
                 "option_conids": [option_conid] if option_conid else [],
                 "option_conid": option_conid,
-                "sentiment": "bullish" if side == "CALL" else "bearish",
+                "sentiment": sentiment,
                 "conid": stock_conid,
                 "alert_details": {
                     "ticker": ticker,
                     "strike": str(int(strike)) if strike.is_integer() else str(strike),
-                    "side": "C" if side == "CALL" else "P",
+                    "side": side_short,
                     "expiry": expiry,
-                    "is_bullish": side == "CALL"
+                    "is_bullish": is_bullish
                 }
             }
             
@@ -1167,21 +1362,23 @@ class LiteProfAndKianHandler:
         """Send BUY alert Telegram message"""
         try:
             # Format the message
-            side_short = "C" if side == "CALL" else "P"
-            emoji = "🔴 📉" if side == "PUT" else "🟢 📈"
+            side_short, _, emoji, _ = _SIDE_META[side]
             
-            telegram_message = f"🚨 {self.alerter_name.upper()}\n{_compact_discord_links(message)}\n\n"
             formatted_expiry = _format_expiry_for_display(expiry)
-            telegram_message += f"{emoji} {ticker} - {int(strike) if strike.is_integer() else strike}{side_short} - {formatted_expiry}"
+            parts = [
+                f"🚨 {self.alerter_name.upper()}\n{_compact_discord_links(message)}\n\n",
+                f"{emoji} {ticker} - {int(strike) if strike.is_integer() else strike}{side_short} - {formatted_expiry}"
+            ]
             
             # Add links if CONIDs available
             if stock_conid:
-                chain_link = f"https://www.interactivebrokers.ie/portal/?loginType=2&action=ACCT_MGMT_MAIN&clt=0&RL=1&locale=es_ES#/quote/{stock_conid}/option/option.chain?source=onebar&u=false"
-                telegram_message += f"  <a href='{chain_link}'>Option Chain</a>"
+                chain_link = _PORTAL_QUOTE_URL + str(stock_conid) + _CHAIN_SUFFIX
+                parts.append(f"  <a href='{chain_link}'>Option Chain</a>")
             
             if option_conid:
-                quote_link = f"https://www.interactivebrokers.ie/portal/?loginType=2&action=ACCT_MGMT_MAIN&clt=0&RL=1&locale=es_ES#/quote/{option_conid}?source=onebar&u=false"
-                telegram_message += f" | <a href='{quote_link}'>🔗 Option Quote</a>"
+                quote_link = _PORTAL_QUOTE_URL + str(option_conid) + _QUOTE_SUFFIX
+                parts.append(f" | <a href='{quote_link}'>🔗 Option Quote</a>")
+            telegram_message = "".join(parts)
             
             # Send via telegram service
             result = await telegram_service.send_buy_alert(telegram_message)
@@ -1195,7 +1392,7 @@ class LiteProfAndKianHandler:
     async def _send_update_telegram(self, message: str) -> Dict[str, Any]:
         """Send UPDATE alert Telegram message with all stored alerts"""
         try:
-            alerts = _load_alerts()
+            alerts = _get_alerts()
             alerter_alerts = alerts.get(self.alerter_name, {})
             
             # Check if there are any open alerts with option quote links
@@ -1211,17 +1408,19 @@ class LiteProfAndKianHandler:
                 telegram_message = f"{self.alerter_name.upper()}\n{_compact_discord_links(message)}\n\n"
             
             # Add all stored alerts with option quote links
+            lines = [telegram_message]
             for ticker, alert_data in alerter_alerts.items():
                 if alert_data.get("option_conid"):  # Show any alert with valid option_conid
                     details = alert_data["alert_details"]
                     
                     option_conid = alert_data["option_conid"]
-                    quote_link = f"https://www.interactivebrokers.ie/portal/?loginType=2&action=ACCT_MGMT_MAIN&clt=0&RL=1&locale=es_ES#/quote/{option_conid}?source=onebar&u=false"
+                    quote_link = _PORTAL_QUOTE_URL + str(option_conid) + _QUOTE_SUFFIX
 
                     # Format expiry date for readability
                     formatted_expiry = _format_expiry_for_display(details['expiry'])
                     
-                    telegram_message += f"{ticker} - {details['strike']}{details['side']} - {formatted_expiry}  <a href='{quote_link}'>🔗 Option Quote</a>\n"
+                    lines.append(f"{ticker} - {details['strike']}{details['side']} - {formatted_expiry}  <a href='{quote_link}'>🔗 Option Quote</a>\n")
+            telegram_message = "".join(lines)
 
             # Send via telegram service
             result = await telegram_service.send_update_message(telegram_message)
@@ -1255,23 +1454,23 @@ class LiteProfAndKianHandler:
         EXP: 05/15/2025
         """
         # Look for TICKER: pattern - must be at least 2 characters
-        ticker_match = re.search(r'TICKER:\s*([A-Z]{2,5})', message.upper())
+        ticker_match = _PK_TICKER_RE.search(message)
         if not ticker_match:
             return None
         
-        ticker = ticker_match.group(1)
+        ticker = ticker_match.group(1).upper()
         
         # Additional validation: ensure ticker is at least 2 characters
         if len(ticker) < 2:
             return None
         
         # Look for STRIKE: pattern with side (C/P)
-        strike_match = re.search(r'STRIKE:\s*(\d+(?:\.\d+)?)([CP])', message.upper())
+        strike_match = _PK_STRIKE_RE.search(message)
         if not strike_match:
             return None
         
         strike = float(strike_match.group(1))
-        side = "CALL" if strike_match.group(2) == "C" else "PUT"
+        side = "CALL" if strike_match.group(2) in "Cc" else "PUT"
         
         # Verify it's a real stock by getting CONID
         try:
@@ -1301,23 +1500,23 @@ class LiteProfAndKianHandler:
         from datetime import datetime, timedelta
         
         # Look for EXP: pattern
-        exp_match = re.search(r'EXP:\s*([^\s\n]+)', message.upper())
+        exp_match = _PK_EXP_RE.search(message)
         if not exp_match:
             # No EXP found, use default logic
             return self._get_default_expiry(ticker)
         
-        exp_text = exp_match.group(1)
+        exp_text = exp_match.group(1).upper()
         
         # Handle different expiry formats
         
         # Full date: 05/15/2025
-        full_date_match = re.match(r'(\d{1,2})/(\d{1,2})/(\d{4})', exp_text)
+        full_date_match = _PK_FULL_DATE_RE.match(exp_text)
         if full_date_match:
             month, day, year = full_date_match.groups()
             return f"{int(month):02d}/{int(day):02d}/{year}"
         
         # Month/day without year: 10/3
-        md_match = re.match(r'(\d{1,2})/(\d{1,2})$', exp_text)
+        md_match = _PK_MONTH_DAY_RE.match(exp_text)
         if md_match:
             month, day = int(md_match.group(1)), int(md_match.group(2))
             if 1 <= month <= 12 and 1 <= day <= 31:
@@ -1332,7 +1531,7 @@ class LiteProfAndKianHandler:
                     return f"{month:02d}/{day:02d}/{current_year}"
         
         # Monthly options: 1/2027exp
-        monthly_match = re.match(r'(\d{1,2})/(\d{4})EXP?', exp_text)
+        monthly_match = _PK_MONTHLY_RE.match(exp_text)
         if monthly_match:
             month, year = int(monthly_match.group(1)), int(monthly_match.group(2))
             if 1 <= month <= 12:
@@ -1428,7 +1627,7 @@ class LiteRobinDaHoodHandler:
             stock_conid = buy_info["stock_conid"]
             
             # Extract expiry (default to today if not found)
-            strike_match = re.search(rf'{_normalize_strike_for_regex(strike)}[CP]', message.upper())
+            strike_match = re.search(rf'{_normalize_strike_for_regex(strike)}[CP]', message, re.IGNORECASE)
             strike_pos = strike_match.end() if strike_match else len(message)
             expiry = _extract_expiry(message, strike_pos, ticker)
             
@@ -1444,8 +1643,9 @@ class LiteRobinDaHoodHandler:
             except Exception as e:
                 logger.warning(f"Could not get option CONID: {e}")
             
-            # Store the alert
-            self._store_alert(ticker, strike, side, expiry, stock_conid, option_conid)
+            # Store the alert; the stored created_at and the result's processed_at share one clock read
+            processed_at = datetime.now().isoformat()
+            self._store_alert(ticker, strike, side, expiry, stock_conid, option_conid, processed_at)
             
             # Send Telegram message
             telegram_result = await self._send_buy_telegram(
@@ -1462,7 +1662,7 @@ class LiteRobinDaHoodHandler:
                 "stock_conid": stock_conid,
                 "option_conid": option_conid,
                 "telegram_sent": telegram_result,
-                "processed_at": datetime.now().isoformat()
+                "processed_at": processed_at
             }
             
         except Exception as e:
@@ -1488,27 +1688,28 @@ class LiteRobinDaHoodHandler:
             return {"error": str(e)}
     
     def _store_alert(self, ticker: str, strike: float, side: str, expiry: str, 
-                     stock_conid: int, option_conid: Optional[int]) -> None:
+                     stock_conid: int, option_conid: Optional[int], created_at: str) -> None:
         """Store alert in alerts.json"""
         try:
-            alerts = _load_alerts()
+            side_short, sentiment, _, is_bullish = _SIDE_META[side]
+            alerts = _get_alerts()
             
             if self.alerter_name not in alerts:
                 alerts[self.alerter_name] = {}
             
             alerts[self.alerter_name][ticker] = {
                 "open": False,  # Always start as closed - only order tracking sets this to True
-                "created_at": datetime.now().isoformat(),
+                "created_at": created_at,
                 "option_conids": [option_conid] if option_conid else [],
                 "option_conid": option_conid,
-                "sentiment": "bullish" if side == "CALL" else "bearish",
+                "sentiment": sentiment,
                 "conid": stock_conid,
                 "alert_details": {
                     "ticker": ticker,
                     "strike": str(int(strike)) if strike.is_integer() else str(strike),
-                    "side": "C" if side == "CALL" else "P",
+                    "side": side_short,
                     "expiry": expiry,
-                    "is_bullish": side == "CALL"
+                    "is_bullish": is_bullish
                 }
             }
             
@@ -1523,21 +1724,23 @@ class LiteRobinDaHoodHandler:
         """Send BUY alert Telegram message"""
         try:
             # Format the message
-            side_short = "C" if side == "CALL" else "P"
-            emoji = "🔴 📉" if side == "PUT" else "🟢 📈"
+            side_short, _, emoji, _ = _SIDE_META[side]
             
-            telegram_message = f"🚨 {self.alerter_name.upper()}\n{_compact_discord_links(message)}\n\n"
             formatted_expiry = _format_expiry_for_display(expiry)
-            telegram_message += f"{emoji} {ticker} - {int(strike) if strike.is_integer() else strike}{side_short} - {formatted_expiry}"
+            parts = [
+                f"🚨 {self.alerter_name.upper()}\n{_compact_discord_links(message)}\n\n",
+                f"{emoji} {ticker} - {int(strike) if strike.is_integer() else strike}{side_short} - {formatted_expiry}"
+            ]
             
             # Add links if CONIDs available
             if stock_conid:
-                chain_link = f"https://www.interactivebrokers.ie/portal/?loginType=2&action=ACCT_MGMT_MAIN&clt=0&RL=1&locale=es_ES#/quote/{stock_conid}/option/option.chain?source=onebar&u=false"
-                telegram_message += f"  <a href='{chain_link}'>Option Chain</a>"
+                chain_link = _PORTAL_QUOTE_URL + str(stock_conid) + _CHAIN_SUFFIX
+                parts.append(f"  <a href='{chain_link}'>Option Chain</a>")
             
             if option_conid:
-                quote_link = f"https://www.interactivebrokers.ie/portal/?loginType=2&action=ACCT_MGMT_MAIN&clt=0&RL=1&locale=es_ES#/quote/{option_conid}?source=onebar&u=false"
-                telegram_message += f" | <a href='{quote_link}'>🔗 Option Quote</a>"
+                quote_link = _PORTAL_QUOTE_URL + str(option_conid) + _QUOTE_SUFFIX
+                parts.append(f" | <a href='{quote_link}'>🔗 Option Quote</a>")
+            telegram_message = "".join(parts)
             
             # Send via telegram service
             result = await telegram_service.send_buy_alert(telegram_message)
@@ -1551,7 +1754,7 @@ class LiteRobinDaHoodHandler:
     async def _send_update_telegram(self, message: str) -> Dict[str, Any]:
         """Send UPDATE alert Telegram message with all stored alerts"""
         try:
-            alerts = _load_alerts()
+            alerts = _get_alerts()
             alerter_alerts = alerts.get(self.alerter_name, {})
             
             # Check if there are any open alerts with option quote links
@@ -1567,17 +1770,19 @@ class LiteRobinDaHoodHandler:
                 telegram_message = f"{self.alerter_name.upper()}\n{_compact_discord_links(message)}\n\n"
             
             # Add all stored alerts with option quote links
+            lines = [telegram_message]
             for ticker, alert_data in alerter_alerts.items():
                 if alert_data.get("option_conid"):  # Show any alert with valid option_conid
                     details = alert_data["alert_details"]
                     
                     option_conid = alert_data["option_conid"]
-                    quote_link = f"https://www.interactivebrokers.ie/portal/?loginType=2&action=ACCT_MGMT_MAIN&clt=0&RL=1&locale=es_ES#/quote/{option_conid}?source=onebar&u=false"
+                    quote_link = _PORTAL_QUOTE_URL + str(option_conid) + _QUOTE_SUFFIX
                     
                     # Format expiry date for readability
                     formatted_expiry = _format_expiry_for_display(details['expiry'])
                     
-                    telegram_message += f"{ticker} - {details['strike']}{details['side']} - {formatted_expiry}  <a href='{quote_link}'>🔗 Option Quote</a>\n"
+                    lines.append(f"{ticker} - {details['strike']}{details['side']} - {formatted_expiry}  <a href='{quote_link}'>🔗 Option Quote</a>\n")
+            telegram_message = "".join(lines)
             
             # Send via telegram service
             result = await telegram_service.send_update_message(telegram_message)
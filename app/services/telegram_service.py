@@ -3,6 +3,7 @@ Telegram bot service for sending trading alerts with Buy/Sell buttons
 """
 import asyncio
 import logging
+import time
 import uuid
 import re
 from typing import Optional, Dict, Any
@@ -15,8 +16,24 @@ except Exception:
     # In test/static analysis environments telegram may not be installed.
     InlineKeyboardButton = InlineKeyboardMarkup = object
 
+# Send errors that mean Telegram itself is unreachable or throttling us; only these
+# count towards the circuit breaker. BadRequest subclasses NetworkError in
+# python-telegram-bot but is a per-message problem, so it is excluded.
+try:
+    from telegram.error import BadRequest, NetworkError, RetryAfter
+    _TRANSPORT_ERRORS = (NetworkError, RetryAfter, OSError, asyncio.TimeoutError)
+except Exception:
+    BadRequest = None
+    _TRANSPORT_ERRORS = (OSError, asyncio.TimeoutError)
+
 logger = logging.getLogger(__name__)
 
+# Circuit breaker for trading alert sends: after this many consecutive
+# failures, callers are told to skip sending (and the work leading up to it)
+# until the cooldown has elapsed.
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN_SECONDS = 60.0
+
 # Quiet noisy third-party loggers that flood the console (getUpdates/httpx/urllib3)
 try:
     logging.getLogger('httpx').setLevel(logging.WARNING)
@@ -45,6 +62,39 @@ class TelegramService:
         self.buy_alerts_chat_id = os.getenv("TELEGRAM_BUY_ALERTS_CHAT_ID")
         self.updates_chat_id = os.getenv("TELEGRAM_UPDATES_CHAT_ID")
 
+        # Circuit breaker state for batched trading alert sends
+        self._consecutive_send_failures = 0
+        self._circuit_opened_at: Optional[float] = None
+
+    def circuit_open(self) -> bool:
+        """True while trading alert sends are short-circuited after repeated failures.
+
+        Once the cooldown elapses the circuit half-opens: the next send is
+        attempted, and a single success closes it again.
+        """
+        if self._circuit_opened_at is None:
+            return False
+        return time.monotonic() - self._circuit_opened_at < CIRCUIT_COOLDOWN_SECONDS
+
+    @staticmethod
+    def _is_transport_error(error: BaseException) -> bool:
+        """True if a send error means Telegram is unreachable rather than the alert being bad"""
+        if BadRequest is not None and isinstance(error, BadRequest):
+            return False
+        return isinstance(error, _TRANSPORT_ERRORS)
+
+    def _record_send_result(self, success: bool):
+        """Update the circuit breaker with the outcome of a trading alert send"""
+        if success:
+            self._consecutive_send_failures = 0
+            self._circuit_opened_at = None
+            return
+        self._consecutive_send_failures += 1
+        if self._consecutive_send_failures >= CIRCUIT_FAILURE_THRESHOLD:
+            if not self.circuit_open():
+                logger.warning(f"Telegram circuit opened after {self._consecutive_send_failures} consecutive send failures")
+            self._circuit_opened_at = time.monotonic()
+
     async def get_chat_id(self, username: str = "Kevchan") -> Optional[str]:
         """Get chat ID for a specific username (if possible)"""
         # Note: Telegram bots cannot directly get chat IDs by username
@@ -337,9 +387,12 @@ class TelegramService:
         except Exception:
             return False
 
-    def _find_matching_open_position(self, text: str) -> dict | None:
+    def _find_matching_open_position(self, text: str, positions: list | None = None) -> dict | None:
         """Search IBKR open positions for a ticker mentioned in `text`.
 
+        `positions` may be a pre-fetched positions snapshot; when None the
+        positions are fetched from IBKR.
+
         Returns the position dict when a match is found (prefers exact symbol or $SYMBOL),
         otherwise None.
         """
@@ -349,18 +402,19 @@ class TelegramService:
             # Normalize
             text_lower = text.lower()
 
-            from app.services.ibkr_service import IBKRService
-            ibkr = IBKRService()
+            if positions is None:
+                from app.services.ibkr_service import IBKRService
+                ibkr = IBKRService()
 
-            # Prefer formatted positions, fallback to raw positions
-            positions = []
-            try:
-                positions = ibkr.get_formatted_positions() or []
-            except Exception:
+                # Prefer formatted positions, fallback to raw positions
+                positions = []
                 try:
-                    positions = ibkr.get_positions() or []
+                    positions = ibkr.get_formatted_positions() or []
                 except Exception:
-                    positions = []
+                    try:
+                        positions = ibkr.get_positions() or []
+                    except Exception:
+                        positions = []
 
             candidate = None
             candidate_score = 0
@@ -1678,13 +1732,20 @@ class TelegramService:
                     "message_id": message_id
                 }
 
-            sent_message = await self.bot.send_message(
-                chat_id=final_chat_id,
-                text=alert_html,
-                reply_markup=reply_markup,
-                parse_mode='HTML',
-                disable_web_page_preview=True
-            )
+            try:
+                sent_message = await self.bot.send_message(
+                    chat_id=final_chat_id,
+                    text=alert_html,
+                    reply_markup=reply_markup,
+                    parse_mode='HTML',
+                    disable_web_page_preview=True
+                )
+            except Exception as send_error:
+                # Only transport failures trip the circuit breaker
+                if self._is_transport_error(send_error):
+                    self._record_send_result(False)
+                raise
+            self._record_send_result(True)
             
             logger.info(f"Sent trading alert to Telegram. Message ID: {message_id}")
             
@@ -1705,6 +1766,27 @@ class TelegramService:
                 "error": str(e)
             }
     
+    async def send_trading_alerts_batch(self, alerts: list) -> list:
+        """
+        Send several trading alerts concurrently
+
+        Args:
+            alerts: List of keyword-argument dicts for send_trading_alert
+
+        Returns:
+            List of send results (or exceptions) in the same order as `alerts`
+        """
+        results = await asyncio.gather(
+            *(self.send_trading_alert(**alert) for alert in alerts),
+            return_exceptions=True
+        )
+        # send_trading_alert records its own Telegram outcome; an exception escaping it
+        # only counts against the circuit if it is a transport failure
+        for result in results:
+            if isinstance(result, BaseException) and self._is_transport_error(result):
+                self._record_send_result(False)
+        return results
+    
     async def start_bot(self):
         """Start the Telegram bot to listen for callbacks"""
         try:
@@ -7,5 +7,6 @@ This package contains all test files organized by functionality:
 - notifications/: Notification system tests
 - integration/: End-to-end integration tests
 - demslayer/: Demslayer handler tests
+- storage/: JSON storage tests
 - curl/: Shell script API tests
 """
@@ -0,0 +1,56 @@
+"""
+Shared fixtures for the JSON-backed store tests.
+"""
+import time
+
+import pytest
+
+
+@pytest.fixture
+def make_store(tmp_path, monkeypatch):
+    """Build a store writing under tmp_path with a short flush delay; pending writes land on teardown"""
+    stores = []
+
+    def make(module, store_cls, storage_file):
+        # The stores resolve their file under <cwd>/data
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(module, "FLUSH_DELAY", 0.05)
+        store = store_cls(storage_file)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.flush()
+
+
+@pytest.fixture
+def wait_for_flush():
+    """Wait until a store's flusher has written its pending changes"""
+    def wait(store):
+        deadline = time.monotonic() + 2
+        while store._dirty and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert not store._dirty
+        # The flusher holds the save lock until its write has landed
+        with store._save_lock:
+            pass
+
+    return wait
+
+
+@pytest.fixture
+def track_saves(monkeypatch):
+    """Record every call of a store's save method, failing the first `failures` of them"""
+    def track(store, save_name, failures=0):
+        calls = []
+        original = getattr(store, save_name)
+
+        def save():
+            calls.append(1)
+            return False if len(calls) <= failures else original()
+
+        monkeypatch.setattr(store, save_name, save)
+        return calls
+
+    return track
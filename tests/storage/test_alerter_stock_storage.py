@@ -0,0 +1,53 @@
+"""
+Tests for AlerterStockStorage's ACTIVE ticker index and debounced writes.
+"""
+import json
+
+import pytest
+
+import app.services.alerter_stock_storage as alerter_stock_storage
+from app.services.alerter_stock_storage import AlerterStockStorage
+
+
+@pytest.fixture
+def storage(make_store):
+    return make_store(alerter_stock_storage, AlerterStockStorage, "stocks.json")
+
+
+def test_active_stocks_keep_stored_order(storage):
+    for ticker in ("TSLA", "AAPL", "NVDA", "AMD"):
+        storage.add_stock_alert("real-day-trading", ticker, {})
+    storage.close_stock_alert("real-day-trading", "AAPL")
+    assert storage.get_active_stocks("real-day-trading") == ["TSLA", "NVDA", "AMD"]
+
+
+def test_reopened_stock_keeps_its_position(storage):
+    for ticker in ("TSLA", "AAPL", "NVDA"):
+        storage.add_stock_alert("real-day-trading", ticker, {})
+    storage.close_stock_alert("real-day-trading", "TSLA")
+    storage.add_stock_alert("real-day-trading", "TSLA", {})
+    assert storage.get_active_stocks("real-day-trading") == ["TSLA", "AAPL", "NVDA"]
+    assert storage.is_stock_already_alerted("real-day-trading", "TSLA")
+
+
+def test_removed_stock_leaves_the_index(storage):
+    storage.add_stock_alert("real-day-trading", "TSLA", {})
+    storage.add_stock_alert("real-day-trading", "AAPL", {})
+    storage.remove_stock_alert("real-day-trading", "TSLA")
+    assert storage.get_active_stocks("real-day-trading") == ["AAPL"]
+    assert not storage.is_stock_already_alerted("real-day-trading", "TSLA")
+
+
+def test_burst_of_alerts_is_written_once(storage, wait_for_flush, track_saves):
+    saves = track_saves(storage, "_save_stocks")
+    for ticker in ("TSLA", "AAPL", "NVDA"):
+        storage.add_stock_alert("real-day-trading", ticker, {})
+    storage.close_stock_alert("real-day-trading", "AAPL")
+    wait_for_flush(storage)
+    assert len(saves) == 1
+    with open(storage.storage_path) as f:
+        stored = json.load(f)["real-day-trading"]
+    assert list(stored) == ["TSLA", "AAPL", "NVDA"]
+    assert stored["AAPL"]["status"] == "CLOSED"
+    reloaded = AlerterStockStorage("stocks.json")
+    assert reloaded.get_active_stocks("real-day-trading") == ["TSLA", "NVDA"]
@@ -0,0 +1,162 @@
+"""
+Tests for the cached, debounced alerts.json store in the lite handlers.
+"""
+import json
+import os
+import time
+
+import pytest
+
+import app.services.handlers.lite_handlers as lite
+
+
+@pytest.fixture
+def alerts_file(tmp_path, monkeypatch):
+    path = tmp_path / "alerts" / "alerts.json"
+    monkeypatch.setattr(lite, "ALERTS_FILE", str(path))
+    monkeypatch.setattr(lite, "ALERTS_FLUSH_DELAY", 0.05)
+    monkeypatch.setattr(lite, "_ALERTS_CACHE", {"mtime": 0, "raw": b"{}", "dirty": False})
+    yield path
+    # Never leave a pending write aimed at this test's file
+    lite._flush_alerts()
+
+
+def _wait_for_flush():
+    deadline = time.monotonic() + 2
+    while lite._ALERTS_CACHE["dirty"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not lite._ALERTS_CACHE["dirty"]
+    # The flusher holds the save lock until its write has landed
+    with lite._ALERTS_SAVE_LOCK:
+        pass
+
+
+def test_missing_file_loads_empty(alerts_file):
+    assert lite._get_alerts() == {}
+
+
+def test_saved_alerts_visible_before_flush(alerts_file):
+    lite._save_alerts({"demslayer": {"SPX": {"open": False}}})
+    assert lite._get_alerts() == {"demslayer": {"SPX": {"open": False}}}
+    _wait_for_flush()
+    assert json.loads(alerts_file.read_text()) == {"demslayer": {"SPX": {"open": False}}}
+    assert not os.path.exists(str(alerts_file) + ".tmp")
+
+
+def test_unsaved_changes_do_not_leak(alerts_file):
+    lite._save_alerts({"demslayer": {"SPX": {"open": False}}})
+    alerts = lite._get_alerts()
+    alerts["demslayer"]["SPX"]["open"] = True
+    alerts["demslayer"]["QQQ"] = {}
+    assert lite._get_alerts() == {"demslayer": {"SPX": {"open": False}}}
+
+
+def test_changes_after_save_do_not_leak(alerts_file):
+    alerts = {"demslayer": {"SPX": {"open": False}}}
+    lite._save_alerts(alerts)
+    alerts["demslayer"]["SPX"]["open"] = True
+    _wait_for_flush()
+    assert json.loads(alerts_file.read_text())["demslayer"]["SPX"]["open"] is False
+
+
+def test_burst_of_saves_is_one_write(alerts_file, monkeypatch):
+    writes = []
+    real_replace = os.replace
+
+    def counting_replace(src, dst):
+        writes.append(dst)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(lite.os, "replace", counting_replace)
+    for i in range(10):
+        lite._save_alerts({"demslayer": {"SPX": {"n": i}}})
+    _wait_for_flush()
+    assert len(writes) == 1
+    assert json.loads(alerts_file.read_text()) == {"demslayer": {"SPX": {"n": 9}}}
+
+
+def test_external_edit_is_picked_up(alerts_file):
+    lite._save_alerts({"demslayer": {}})
+    _wait_for_flush()
+    assert lite._get_alerts() == {"demslayer": {}}
+
+    alerts_file.write_text(json.dumps({"profandkian": {}}))
+    # Make sure the mtime moves even on coarse-grained filesystems
+    stat = os.stat(alerts_file)
+    os.utime(alerts_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert lite._get_alerts() == {"profandkian": {}}
+
+
+def test_flush_does_not_block_loads_during_write(alerts_file, monkeypatch):
+    lite._save_alerts({"demslayer": {}})
+    real_replace = os.replace
+    seen = []
+
+    def slow_replace(src, dst):
+        # A load while the file write is in progress must not wait on it
+        start = time.monotonic()
+        seen.append(lite._get_alerts())
+        seen.append(time.monotonic() - start)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(lite.os, "replace", slow_replace)
+    lite._flush_alerts()
+    assert seen[0] == {"demslayer": {}}
+    assert seen[1] < 1
+
+
+def test_failed_write_stays_pending(alerts_file, monkeypatch):
+    lite._save_alerts({"demslayer": {}})
+    real_replace = os.replace
+    failures = [OSError("disk full")]
+
+    def failing_replace(src, dst):
+        if failures:
+            raise failures.pop()
+        real_replace(src, dst)
+
+    monkeypatch.setattr(lite.os, "replace", failing_replace)
+    lite._flush_alerts()
+    assert lite._ALERTS_CACHE["dirty"]
+    lite._flush_alerts()
+    assert not lite._ALERTS_CACHE["dirty"]
+    assert json.loads(alerts_file.read_text()) == {"demslayer": {}}
+
+
+def test_explicit_flush_writes_indented_json(alerts_file):
+    lite._save_alerts({"demslayer": {}})
+    lite._flush_alerts(pretty=True)
+    assert alerts_file.read_text() == '{\n  "demslayer": {}\n}'
+
+
+def _best_of(func, repeat=5, number=20):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_cached_load_costs_about_one_parse(alerts_file):
+    # A cached load hands out a private copy; that copy must cost no more than
+    # re-reading the file would, or the cache is slower than having none
+    alerts = {
+        "demslayer": {
+            f"SPX_{i}": {
+                "ticker": "SPX", "strike": 5000 + i, "side": "CALL", "expiry": "20250101",
+                "conid": 700000 + i, "open": True, "timestamp": "2025-01-01T10:00:00",
+                "updates": [{"price": 1.5, "note": "trim"}],
+            }
+            for i in range(800)
+        }
+    }
+    lite._save_alerts(alerts)
+    lite._flush_alerts()
+    assert lite._get_alerts() == alerts
+
+    raw = alerts_file.read_bytes()
+    cached = _best_of(lite._get_alerts)
+    parse_only = _best_of(lambda: lite._parse_alerts(raw))
+    assert cached < parse_only * 2
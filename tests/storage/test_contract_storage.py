@@ -0,0 +1,34 @@
+"""
+Tests for ContractStorage's debounced background writes.
+"""
+import json
+import os
+
+import pytest
+
+import app.services.contract_storage as contract_storage
+from app.services.contract_storage import ContractStorage
+
+
+@pytest.fixture
+def storage(make_store):
+    return make_store(contract_storage, ContractStorage, "contracts.json")
+
+
+def test_stored_contract_reaches_disk(storage, wait_for_flush):
+    storage.store_contract("demslayer-spx-alerts", {"conid": 1})
+    wait_for_flush(storage)
+    with open(storage.storage_path) as f:
+        assert json.load(f)["demslayer-spx-alerts"]["conid"] == 1
+    assert not os.path.exists(storage.storage_path + ".tmp")
+    assert ContractStorage("contracts.json").get_contract("demslayer-spx-alerts")["conid"] == 1
+
+
+def test_burst_of_mutations_is_written_once(storage, wait_for_flush, track_saves):
+    saves = track_saves(storage, "_save_contracts")
+    for i in range(20):
+        storage.store_contract(f"alerter-{i}", {"conid": i})
+    wait_for_flush(storage)
+    assert len(saves) == 1
+    with open(storage.storage_path) as f:
+        assert len(json.load(f)) == 20
@@ -0,0 +1,58 @@
+"""
+Tests for the background flusher shared by ContractStorage and AlerterStockStorage.
+"""
+import json
+import time
+
+import pytest
+
+import app.services.alerter_stock_storage as alerter_stock_storage
+import app.services.contract_storage as contract_storage
+from app.services.alerter_stock_storage import AlerterStockStorage
+from app.services.contract_storage import ContractStorage
+
+
+def _store_contract(store):
+    store.store_contract("demslayer-spx-alerts", {"conid": 1})
+
+
+def _add_stock(store):
+    store.add_stock_alert("real-day-trading", "TSLA", {})
+
+
+# Module, store class, save method, one mutation, and the top-level key it writes
+STORES = {
+    "contracts": (contract_storage, ContractStorage, "_save_contracts", _store_contract, "demslayer-spx-alerts"),
+    "stocks": (alerter_stock_storage, AlerterStockStorage, "_save_stocks", _add_stock, "real-day-trading"),
+}
+
+
+@pytest.fixture(params=list(STORES))
+def store_case(request, make_store):
+    module, store_cls, save_name, mutate, key = STORES[request.param]
+    return module, make_store(module, store_cls, "store.json"), save_name, mutate, key
+
+
+def test_flush_writes_pending_changes_now(store_case, monkeypatch):
+    module, store, _, mutate, key = store_case
+    # Keep the flusher thread out of the way so only flush() can write
+    monkeypatch.setattr(module, "FLUSH_DELAY", 60)
+    mutate(store)
+    store.flush()
+    with open(store.storage_path) as f:
+        assert key in json.load(f)
+
+
+def test_failed_write_stays_pending(store_case, track_saves):
+    _, store, save_name, mutate, key = store_case
+    attempts = track_saves(store, save_name, failures=1)
+    mutate(store)
+    deadline = time.monotonic() + 2
+    while not attempts and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with store._save_lock:
+        assert store._dirty
+    store.flush()
+    assert not store._dirty
+    with open(store.storage_path) as f:
+        assert key in json.load(f)
@@ -0,0 +1,55 @@
+"""
+Tests for TelegramBatcher, which coalesces trading alerts into batched sends.
+"""
+import asyncio
+import importlib
+
+from app.services.alerter_manager import TelegramBatcher
+
+# The services package re-exports the manager instance under the module's name
+alerter_manager = importlib.import_module("app.services.alerter_manager")
+
+
+class _FakeTelegram:
+    """Stands in for telegram_service; answers each batch with `reply(alerts)`"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.batches = []
+
+    async def send_trading_alerts_batch(self, alerts):
+        self.batches.append(alerts)
+        return self.reply(alerts)
+
+
+def _submit_all(batcher, count):
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(
+            *(batcher.submit("test", f"alert {i}", "SPY", "", {}) for i in range(count)),
+            return_exceptions=True,
+        ), timeout=2)
+    return asyncio.run(run())
+
+
+def test_burst_is_sent_as_one_batch(monkeypatch):
+    fake = _FakeTelegram(lambda alerts: [{"success": True, "message": a["message"]} for a in alerts])
+    monkeypatch.setattr(alerter_manager, "telegram_service", fake)
+    results = _submit_all(TelegramBatcher(max_batch_size=8, max_wait_ms=20), 3)
+    assert len(fake.batches) == 1
+    assert [r["message"] for r in results] == ["alert 0", "alert 1", "alert 2"]
+
+
+def test_batch_send_error_fails_every_submitter(monkeypatch):
+    def reply(alerts):
+        raise ConnectionError("telegram unreachable")
+    monkeypatch.setattr(alerter_manager, "telegram_service", _FakeTelegram(reply))
+    results = _submit_all(TelegramBatcher(max_wait_ms=20), 3)
+    assert all(isinstance(r, ConnectionError) for r in results)
+
+
+def test_short_result_list_fails_remaining_submitters(monkeypatch):
+    fake = _FakeTelegram(lambda alerts: [{"success": True}])
+    monkeypatch.setattr(alerter_manager, "telegram_service", fake)
+    results = _submit_all(TelegramBatcher(max_wait_ms=20), 3)
+    assert results[0] == {"success": True}
+    assert all(isinstance(r, RuntimeError) for r in results[1:])
@@ -0,0 +1,99 @@
+"""
+Tests for the Telegram trading alert circuit breaker.
+
+Only transport failures (Telegram unreachable) should open the circuit;
+configuration and per-alert errors must not block other alerts.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.services.telegram_service import (
+    TelegramService,
+    CIRCUIT_COOLDOWN_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD,
+)
+
+
+class _FailingBot:
+    """Bot whose send_message always raises the given error"""
+
+    def __init__(self, error: Exception):
+        self.error = error
+        self.calls = 0
+
+    async def send_message(self, **kwargs):
+        self.calls += 1
+        raise self.error
+
+
+@pytest.fixture
+def service(fake_ibkr):
+    svc = TelegramService(bot_token="")
+    svc.buy_alerts_chat_id = "12345"
+    return svc
+
+
+def _send_batch(svc, count):
+    alerts = [{"alerter_name": "test", "message": f"alert {i}", "ticker": "SPY"} for i in range(count)]
+    return asyncio.run(svc.send_trading_alerts_batch(alerts))
+
+
+def test_missing_chat_id_does_not_open_circuit(service):
+    service.buy_alerts_chat_id = None
+    results = _send_batch(service, CIRCUIT_FAILURE_THRESHOLD + 1)
+    assert all(r["error"] == "missing_chat_id" for r in results)
+    assert not service.circuit_open()
+
+
+def test_bad_alert_errors_do_not_open_circuit(service):
+    service.bot = _FailingBot(ValueError("can't parse entities"))
+    results = _send_batch(service, CIRCUIT_FAILURE_THRESHOLD + 1)
+    assert service.bot.calls == CIRCUIT_FAILURE_THRESHOLD + 1
+    assert all(not r["success"] for r in results)
+    assert not service.circuit_open()
+
+
+def test_transport_errors_open_circuit(service):
+    service.bot = _FailingBot(ConnectionError("connection reset"))
+    _send_batch(service, CIRCUIT_FAILURE_THRESHOLD)
+    assert service.bot.calls == CIRCUIT_FAILURE_THRESHOLD
+    assert service.circuit_open()
+
+
+def test_transport_exceptions_from_gather_count_as_failures(service, monkeypatch):
+    async def raising_send(**kwargs):
+        raise asyncio.TimeoutError()
+
+    monkeypatch.setattr(service, "send_trading_alert", raising_send)
+    results = _send_batch(service, CIRCUIT_FAILURE_THRESHOLD)
+    assert all(isinstance(r, asyncio.TimeoutError) for r in results)
+    assert service.circuit_open()
+
+
+def test_other_exceptions_from_gather_do_not_open_circuit(service, monkeypatch):
+    async def raising_send(**kwargs):
+        raise KeyError("alerter_name")
+
+    monkeypatch.setattr(service, "send_trading_alert", raising_send)
+    results = _send_batch(service, CIRCUIT_FAILURE_THRESHOLD + 1)
+    assert all(isinstance(r, KeyError) for r in results)
+    assert not service.circuit_open()
+
+
+def test_success_closes_circuit(service):
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        service._record_send_result(False)
+    assert service.circuit_open()
+    service._record_send_result(True)
+    assert not service.circuit_open()
+
+
+def test_circuit_half_opens_after_cooldown(service):
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        service._record_send_result(False)
+    assert service.circuit_open()
+    # Backdate the opening instead of patching the process-wide clock
+    service._circuit_opened_at = time.monotonic() - CIRCUIT_COOLDOWN_SECONDS
+    assert not service.circuit_open()